@@ -0,0 +1,115 @@
+import threading
+import time
+from typing import Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+# Per-call deadlines in seconds for each external endpoint.
+TIMEOUTS = {
+    "translate": 5,
+    "tts": 10,
+    "stt": 20,
+    "llm": 30,
+}
+
+# Seconds a failed lookup is remembered before it is retried.
+NEGATIVE_CACHE_TTL = 60
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an endpoint whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Fail fast on an endpoint after repeated errors.
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    raise CircuitOpenError immediately. Once reset_timeout has passed a single
+    trial call is let through; success closes the circuit, failure reopens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def _before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                raise CircuitOpenError(f"{self.name} is unavailable")
+            self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                print(f"Circuit for {self.name} opened after {self._failures} failures")
+
+    def call(self, func: Callable[..., T], *args, **kwargs) -> T:
+        self._before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Return the process-wide circuit breaker for an endpoint."""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+
+class NegativeCache:
+    """Remembers failed keys for a short TTL so they are not retried on every rerun."""
+
+    def __init__(self, ttl: float = NEGATIVE_CACHE_TTL):
+        self.ttl = ttl
+        self._expiry: Dict = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            expiry = self._expiry.get(key)
+            if expiry is None:
+                return False
+            if time.monotonic() >= expiry:
+                del self._expiry[key]
+                return False
+            return True
+
+    def add(self, key):
+        with self._lock:
+            self._expiry[key] = time.monotonic() + self.ttl
@@ -1,12 +1,121 @@
 import os
+import io
+import re
+import wave
 import requests
 import base64
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 from dotenv import load_dotenv
 import streamlit as st
 
+from api.resilience import TIMEOUTS, CircuitOpenError, NegativeCache, get_breaker
+from utils.curriculum_bundle import load_bundle
+
 load_dotenv()
 
+# Sarvam rejects TTS inputs above this many characters per request.
+TTS_MAX_CHARS = 500
+TTS_MAX_WORKERS = 4
+
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?।॥])\s+|\n+")
+
+
+def _script_of(char: str) -> Optional[str]:
+    """Return 'latin' or 'indic' for letters, None for script-neutral characters."""
+    if char.isascii():
+        return "latin" if char.isalpha() else None
+    if "\u0900" <= char <= "\u0dff":
+        return "indic"
+    return None
+
+
+def _script_runs(sentence: str) -> List[Tuple[str, str]]:
+    """Split a sentence into (script, text) runs; neutral characters stay with the current run."""
+    runs = []
+    current_script, current = None, []
+    for char in sentence:
+        script = _script_of(char)
+        if script and current_script and script != current_script:
+            runs.append((current_script, "".join(current)))
+            current = []
+        if script:
+            current_script = script
+        current.append(char)
+    if current:
+        runs.append((current_script or "latin", "".join(current)))
+    return runs
+
+
+def _hard_split(text: str, max_chars: int) -> List[str]:
+    """Split text that is too long for one request at whitespace."""
+    parts, current = [], ""
+    for word in text.split():
+        while len(word) > max_chars:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(word[:max_chars])
+            word = word[max_chars:]
+        candidate = f"{current} {word}" if current else word
+        if len(candidate) > max_chars:
+            parts.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        parts.append(current)
+    return parts
+
+
+def split_for_tts(text: str, max_chars: int = TTS_MAX_CHARS) -> List[Tuple[str, str]]:
+    """
+    Split long text into TTS-sized chunks at sentence and script boundaries.
+
+    Adjacent sentences in the same script are packed together up to
+    max_chars so short sentences don't each cost a request.
+
+    Returns:
+        List of (script, text) tuples in reading order
+    """
+    chunks: List[Tuple[str, str]] = []
+    for sentence in _SENTENCE_BREAK.split(text):
+        for script, run in _script_runs(sentence):
+            run = run.strip()
+            if not run or not any(_script_of(c) for c in run):
+                continue
+            for part in _hard_split(run, max_chars):
+                if chunks and chunks[-1][0] == script and len(chunks[-1][1]) + len(part) + 1 <= max_chars:
+                    chunks[-1] = (script, f"{chunks[-1][1]} {part}")
+                else:
+                    chunks.append((script, part))
+    return chunks
+
+
+def stitch_wav(segments: List[bytes]) -> bytes:
+    """Concatenate WAV segments that share the first segment's format into one WAV."""
+    output = io.BytesIO()
+    writer = None
+    params = None
+    for segment in segments:
+        with wave.open(io.BytesIO(segment), "rb") as reader:
+            segment_params = (reader.getnchannels(), reader.getsampwidth(), reader.getframerate())
+            if writer is None:
+                params = segment_params
+                writer = wave.open(output, "wb")
+                writer.setnchannels(params[0])
+                writer.setsampwidth(params[1])
+                writer.setframerate(params[2])
+            elif segment_params != params:
+                print(f"Skipping TTS segment with mismatched format {segment_params}")
+                continue
+            writer.writeframes(reader.readframes(reader.getnframes()))
+    if writer is None:
+        return b""
+    writer.close()
+    return output.getvalue()
+
+
 class SarvamAPI:
     """Client for Sarvam AI's text-to-speech and speech-to-text APIs"""
     
@@ -20,20 +129,21 @@ class SarvamAPI:
         self.stt_url = "https://api.sarvam.ai/speech-to-text"
         self.language_code = language
 
-    def text_to_speech(self, text: str, output_path: Optional[str] = None):
+    def text_to_speech(self, text: str, output_path: Optional[str] = None, target_language: str = "en-IN"):
         """
         Convert text to speech using Sarvam's TTS API
         
         Args:
             text: The text to convert to speech
             output_path: Optional path to save the audio file
+            target_language: Sarvam language code of the text, e.g. 'hi-IN'
             
         Returns:
-            Dictionary with audio data and file path if saved
+            WAV bytes, or None if the request failed or the circuit is open
         """
         payload = {
             "text": text,
-            "target_language_code": "en-IN",
+            "target_language_code": target_language,
         }
         headers = {
             "api-subscription-key":os.getenv("SARVAM_API_KEY"),
@@ -41,10 +151,7 @@ class SarvamAPI:
         }
         
         try:
-            response = requests.post(self.tts_url, headers=headers, json=payload)
-            response.raise_for_status()
-            
-            result = response.json()
+            result = get_breaker("tts").call(self._post_json, self.tts_url, headers, payload, TIMEOUTS["tts"])
 
             audio_field = result.get("audios")
             if isinstance(audio_field, list):
@@ -68,9 +175,62 @@ class SarvamAPI:
             
             # return result_dict
             
-        except requests.exceptions.RequestException as e:
-            return e
+        except (requests.exceptions.RequestException, CircuitOpenError) as e:
+            print(f"Error during text-to-speech: {e}")
+            return None
+
+    @staticmethod
+    def _post_json(url, headers, payload, timeout):
+        response = requests.post(url, headers=headers, json=payload, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
     
+    def iter_long_text_to_speech(self, text: str) -> Iterator[bytes]:
+        """
+        Synthesize long, mixed-script text as concurrently requested chunks.
+
+        English runs are voiced as en-IN and native-script runs in the
+        client's language. Chunks are yielded in reading order as soon as
+        each one (and every chunk before it) is ready, so playback can
+        start after the first request returns.
+
+        Args:
+            text: The text to convert to speech
+
+        Yields:
+            WAV bytes for each chunk
+        """
+        native_language = f"{self.language_code}-IN" if self.language_code else "en-IN"
+        chunks = split_for_tts(text)
+        if not chunks:
+            return
+
+        with ThreadPoolExecutor(max_workers=TTS_MAX_WORKERS) as executor:
+            futures = [
+                executor.submit(
+                    self.text_to_speech,
+                    chunk,
+                    target_language="en-IN" if script == "latin" else native_language,
+                )
+                for script, chunk in chunks
+            ]
+            for future in futures:
+                audio = future.result()
+                if audio:
+                    yield audio
+
+    def long_text_to_speech(self, text: str) -> bytes:
+        """
+        Synthesize long, mixed-script text and stitch it into a single WAV.
+
+        Args:
+            text: The text to convert to speech
+
+        Returns:
+            WAV bytes, or empty bytes if nothing could be synthesized
+        """
+        return stitch_wav(list(self.iter_long_text_to_speech(text)))
+
     def speech_to_text(self, audio_file_path: str) -> Dict[str, Any]:
         """
         Convert speech to text using Sarvam's STT API
@@ -82,25 +242,25 @@ class SarvamAPI:
             Dictionary with transcription result
         """
         try:
-            # Read audio file as binary
-            file = {
-                "file" : (audio_file_path, open(audio_file_path, "rb"), "audio/wav")
-            }
-            
-            headers = {
-                "api-subscription-key" : os.getenv("SARVAM_API_KEY")
-            }    
-            response = requests.post(self.stt_url, files = file, headers=headers)
-            response.raise_for_status()
-            
-            result = response.json()
-            return result['transcript']
-            
-        except (requests.exceptions.RequestException, IOError) as e:
+            return get_breaker("stt").call(self._transcribe, audio_file_path)
+        except (requests.exceptions.RequestException, IOError, CircuitOpenError) as e:
             print(f"Error during speech-to-text: {e}")
             return ""
     
-    def translate_text(self, text: str, target_language: str) -> str:
+    def _transcribe(self, audio_file_path: str) -> str:
+        headers = {
+            "api-subscription-key" : os.getenv("SARVAM_API_KEY")
+        }
+        # Read audio file as binary
+        with open(audio_file_path, "rb") as audio_file:
+            file = {
+                "file" : (audio_file_path, audio_file, "audio/wav")
+            }
+            response = requests.post(self.stt_url, files=file, headers=headers, timeout=TIMEOUTS["stt"])
+        response.raise_for_status()
+        return response.json()['transcript']
+
+    def translate_text(self, text: str, target_language: str) -> Optional[str]:
         """
         Translate text to a target language using Sarvam's Translation API
         
@@ -109,7 +269,7 @@ class SarvamAPI:
             target_language: The target language code (e.g., 'es' for Spanish)
             
         Returns:
-            Translated text
+            Translated text, or None if the request failed or the circuit is open
         """
         translation_url = "https://api.sarvam.ai/translate"
         payload = {
@@ -123,21 +283,44 @@ class SarvamAPI:
         }
         
         try:
-            response = requests.post(translation_url, headers=headers, json=payload)
-            response.raise_for_status()
-            
-            result = response.json()
-            return result.get("translated_text", "")
+            result = get_breaker("translate").call(
+                self._post_json, translation_url, headers, payload, TIMEOUTS["translate"]
+            )
+            return result.get("translated_text") or None
             
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, CircuitOpenError) as e:
             print(f"Error during translation: {e}")
-            return "Could not be translated"
+            return None
         
     def t(self, text):
-        return cached_translate(text, self.language_code)
+        """Translate UI text, falling back to the English text if translation is unavailable."""
+        bundle = load_bundle(self.language_code)
+        if bundle is not None:
+            translated = bundle.translation(text)
+            if translated:
+                return translated
+        key = (text, self.language_code)
+        if key in failed_translations:
+            return text
+        try:
+            return cached_translate(text, self.language_code)
+        except TranslationUnavailable:
+            failed_translations.add(key)
+            return text
     
 
+class TranslationUnavailable(Exception):
+    """Raised so failed translations are never stored by st.cache_data."""
+
+
+# Failed lookups are retried after NEGATIVE_CACHE_TTL instead of the hour
+# successful translations are cached for.
+failed_translations = NegativeCache()
+
 sarvam_api = SarvamAPI()
 @st.cache_data(ttl=3600)
 def cached_translate(text,lang):
-    return sarvam_api.translate_text(text, target_language=lang)
+    translated = sarvam_api.translate_text(text, target_language=lang)
+    if translated is None:
+        raise TranslationUnavailable(text)
+    return translated
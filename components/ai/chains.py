@@ -1,18 +1,53 @@
 from langchain_classic.chains import LLMChain
-from components.ai.prompt_templates import PromptTemplates
+from pydantic import BaseModel, Field
+
+from components.ai.prompt_templates import GRADING_TEMPLATE_ID, PromptTemplates
+from components.ai.token_usage import TokenUsageTracker
+from api.resilience import TIMEOUTS
 from langchain_openai import ChatOpenAI
 
 
+class Grade(BaseModel):
+    """Structured result of the single-call grading chain."""
+
+    feedback: str = Field(description="Feedback for the learner in their language")
+    score: float = Field(ge=0.0, le=1.0, description="Similarity to the expected response")
+
+
 class Chains:
     def __init__(self):
         self.prompt_templates = PromptTemplates()
-        self.llm = ChatOpenAI(temperature=0, model_name="gpt-5-nano")
+        self.usage = TokenUsageTracker()
+        self.llm = ChatOpenAI(
+            temperature=0,
+            model_name="gpt-5-nano",
+            timeout=TIMEOUTS["llm"],
+            max_retries=1,
+            callbacks=[self.usage],
+        )
 
     def init_apis_and_chains(self):
         lesson_prompt, tutor_prompt, evaluation_prompt = self.prompt_templates.init_prompts()
+        lesson_id, tutor_id, evaluation_id = self.prompt_templates.template_ids()
+
+        lesson_chain = LLMChain(llm=self._llm_for(lesson_id), prompt=lesson_prompt)
+        evaluation_chain = LLMChain(llm=self._llm_for(evaluation_id), prompt=evaluation_prompt)
+        tutor_chain = LLMChain(llm=self._llm_for(tutor_id), prompt=tutor_prompt)
+
+        return lesson_chain, evaluation_chain, tutor_chain
+
+    def init_grading_chain(self):
+        """
+        Chain that grades in one LLM call.
 
-        lesson_chain = LLMChain(llm=self.llm, prompt=lesson_prompt)
-        evaluation_chain = LLMChain(llm=self.llm, prompt=evaluation_prompt)
-        tutor_chain = LLMChain(llm=self.llm, prompt=tutor_prompt)
+        It returns a dict with the validated Grade under "parsed", or a
+        "parsing_error" instead of raising when the output doesn't validate.
+        Pass/fail is decided by the caller's threshold, not the model.
+        """
+        grading_prompt = self.prompt_templates.init_grading_prompt()
+        return grading_prompt | self._llm_for(GRADING_TEMPLATE_ID).with_structured_output(Grade, include_raw=True)
 
-        return lesson_chain, evaluation_chain, tutor_chain
\ No newline at end of file
+    def _llm_for(self, template_id):
+        # LLMChain does not pass its own metadata down to the model's
+        # callbacks, so the template ID is set on a copy of the model.
+        return self.llm.model_copy(update={"metadata": {"template_id": template_id}})
@@ -1,23 +1,60 @@
 import os
+from concurrent.futures import TimeoutError
+from langchain_core.exceptions import OutputParserException
+from pydantic import ValidationError
 from database.user_progress_db import UserProgressDB
 from components.ai.chains import Chains
+from components.ai.prompt_templates import LESSON_TEMPLATE_ID
 from api.sarvam_api import SarvamAPI
+from api.resilience import get_breaker
+from utils.curriculum_bundle import load_bundle
+from utils.curriculum_cache import CurriculumCache
+from utils.speculative_stt import transcriber
+
+# Grading modes: one structured LLM call, or the tutor chain followed by the
+# evaluation chain. Selected with the GRADING_MODE environment variable.
+GRADING_COMBINED = "combined"
+GRADING_TWO_CALL = "two_call"
+
+# Generated lesson text per prompt, keyed by (level, stage, language)
+lesson_texts = CurriculumCache("lesson_texts")
+
 
 class LessonService:
-    def __init__(self):
+    def __init__(self, grading_mode=None):
         self.db = UserProgressDB()
         self.chain = Chains()
         lesson_chain, evaluation_chain, tutor_chain = self.chain.init_apis_and_chains()
         self.lesson_chain = lesson_chain  # fixed typo: lesson_chainchain → lesson_chain
         self.evaluation_chain = evaluation_chain
         self.tutor_chain = tutor_chain
+        self.grading_chain = self.chain.init_grading_chain()
+        self.grading_mode = grading_mode or os.getenv("GRADING_MODE", GRADING_COMBINED)
         self.sarvam_api = SarvamAPI()
+        self.llm_breaker = get_breaker("llm")
 
     def start_lesson(self, prompt_id, level, stage, language):
+        bundle = load_bundle(language)
+        # Lessons rendered with an older lesson template are regenerated
+        if bundle is not None and bundle.metadata.get("lesson_template_id") == LESSON_TEMPLATE_ID:
+            lesson = bundle.lesson(prompt_id)
+            if lesson:
+                return lesson
+
+        key = (level, stage, language)
+        lesson = lesson_texts.get(prompt_id, key)
+        if lesson is None:
+            lesson = self.generate_lesson(prompt_id, level, stage, language)
+            if lesson:
+                lesson_texts.set(prompt_id, lesson, key)
+        return lesson
+
+    def generate_lesson(self, prompt_id, level, stage, language):
         prompt = self.db.get_prompt(prompt_id)
         expected_user_response = self.db.get_expected_response(prompt_id)
 
-        lesson = self.lesson_chain.run(
+        lesson = self.llm_breaker.call(
+            self.lesson_chain.run,
             level=level,
             stage=stage,
             prompt=prompt,
@@ -27,34 +64,95 @@ class LessonService:
 
         return lesson
 
-    def process_response(self, prompt_id, level, stage, language, threshold):
-        prompt = self.db.get_prompt(prompt_id)
-        notes_for_ai = self.db.get_notes(prompt_id)
+    def process_response(self, prompt_id, level, stage, language, threshold, recording_id=None, audio_bytes=None):
+        # Use the transcript started when the recording was saved; if the job
+        # is gone (evicted or discarded), transcribe the saved bytes again.
+        if recording_id is not None and audio_bytes is not None:
+            transcriber.submit(recording_id, audio_bytes)
+        # A slow job is not retried here; that would double the wait.
+        try:
+            user_input = transcriber.result(recording_id)
+        except TimeoutError:
+            return self._not_heard(None, "Transcribing your response took too long. Please try again.")
+
+        result = self.grade_response(prompt_id, level, stage, language, threshold, user_input)
+        # Keep the transcript until it has been graded, so a retry after an
+        # LLM error doesn't lose it; an empty one is transcribed afresh.
+        transcriber.discard(recording_id)
+        return result
+
+    def grade_response(self, prompt_id, level, stage, language, threshold, user_input, mode=None):
+        mode = mode or self.grading_mode
+
+        # Nothing to grade if transcription failed; skip the LLM calls
+        if not user_input:
+            return self._not_heard(user_input, "We could not hear your response. Please record it again.")
 
-        # Get transcription
-        full_path = os.path.abspath("temp.wav")
-        user_input = self.sarvam_api.speech_to_text(full_path)
-        expected_response = self.db.get_expected_response(prompt_id)
+        inputs = {
+            'level': level,
+            'stage': stage,
+            'prompt': self.db.get_prompt(prompt_id),
+            'notes_for_ai': self.db.get_notes(prompt_id),
+            'input': user_input,
+            'expected_response': self.db.get_expected_response(prompt_id),
+            'language': language,
+        }
+        if mode == GRADING_COMBINED:
+            feedback, score = self._grade_combined(inputs)
+        else:
+            feedback, score = self._grade_two_call(inputs)
+
+        lesson_complete = score >= threshold
 
+        return {
+            'user_input': user_input,
+            'feedback': feedback,
+            'score': score,
+            'lesson_complete': lesson_complete,
+            'graded': True
+        }
+
+    @staticmethod
+    def _not_heard(user_input, feedback):
+        return {
+            'user_input': user_input,
+            'feedback': feedback,
+            'score': 0.0,
+            'lesson_complete': False,
+            # Nothing was graded; not recorded as an attempt
+            'graded': False
+        }
+
+    def _grade_combined(self, inputs):
+        # Only transport errors count against the breaker; output that fails
+        # validation (e.g. a score above 1.0) falls back to the two-call path.
+        result = self.llm_breaker.call(self._invoke_grading_chain, inputs)
+        grade = result.get("parsed")
+        if grade is None:
+            print(f"Grading output did not validate, falling back to two calls: {result.get('parsing_error')}")
+            return self._grade_two_call(inputs)
+        return grade.feedback, grade.score
+
+    def _invoke_grading_chain(self, inputs):
+        try:
+            return self.grading_chain.invoke(inputs)
+        except (ValidationError, OutputParserException) as e:
+            # Structured-output clients may validate while parsing the response
+            return {"parsed": None, "parsing_error": e}
+
+    def _grade_two_call(self, inputs):
         # Get feedback
-        feedback = self.tutor_chain.run(
-            level=level,
-            stage=stage,
-            prompt=prompt,
-            notes_for_ai=notes_for_ai,
-            input=user_input,
-            expected_response=expected_response,
-            language=language,
-        )
+        feedback = self.llm_breaker.call(self.tutor_chain.run, **inputs)
 
         # Evaluate
-        score_result = self.evaluation_chain.run(
-            level=level,
-            stage=stage,
+        score_result = self.llm_breaker.call(
+            self.evaluation_chain.run,
+            level=inputs['level'],
+            stage=inputs['stage'],
             feedback=feedback,
-            expected_response=expected_response,
-            user_response=user_input,
-            language=language,
+            expected_response=inputs['expected_response'],
+            user_response=inputs['input'],
+            language=inputs['language'],
         )
 
         # Parse score
@@ -63,11 +161,4 @@ class LessonService:
         except Exception:
             score = 0.0
 
-        lesson_complete = score >= threshold
-
-        return {
-            'user_input': user_input,
-            'feedback': feedback,
-            'score': score,
-            'lesson_complete': lesson_complete
-        }
+        return feedback, score
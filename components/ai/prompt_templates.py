@@ -1,47 +1,59 @@
 from langchain_core.prompts import PromptTemplate
 
-class PromptTemplates:
-    def __init__(self):
-        pass    
-    @staticmethod
-    def init_prompts():
-        lesson_prompt = PromptTemplate(
-            input_variables=["level", "stage", "prompt", "language", "expected_user_response"],
-            template="""
-You are an English tutor for {language} speakers at {level} level.
+# Bump when the wording of a template changes so token and latency
+# accounting can be compared across versions.
+LESSON_TEMPLATE_ID = "lesson.v2"
+TUTOR_TEMPLATE_ID = "tutor.v2"
+EVALUATION_TEMPLATE_ID = "evaluation.v2"
+GRADING_TEMPLATE_ID = "grading.v2"
 
-Present the English phrase "{prompt}" to the learner. Explain what it means in {language} using native script. Show them how to respond in English with "{expected_user_response}". Then ask the learner in {language} (using native script) to practice responding in English.
+# Each template is a fixed instruction prefix followed by the per-call
+# fields. Keeping every variable at the end lets the provider reuse the
+# cached prefix across learners and lessons.
+LESSON_PREFIX = """
+You are an English tutor for Indian learners. Each lesson teaches one English phrase and is explained in the learner's native language.
 
-Write everything in {language} native script except the English phrases being taught.
+Task:
+1. Present the English phrase given under "Phrase" to the learner.
+2. Explain what it means in the learner's language using native script.
+3. Show them how to respond in English with the phrase given under "Expected response".
+4. Ask the learner in their language (using native script) to practice responding in English.
+
+Write everything in the learner's native script except the English phrases being taught.
 """
-        )
 
-        tutor_prompt = PromptTemplate(
-    input_variables=["level", "stage", "prompt", "expected_response", "input", "language"],
-    template="""
-You are an English tutor for a {level} {stage} learner who speaks {language}.
+LESSON_SUFFIX = """
+Learner language: {language}
+Learner level: {level}
+Learner stage: {stage}
+Phrase: "{prompt}"
+Expected response: "{expected_user_response}"
+"""
 
-Lesson: "{prompt}"
-Expected response (in English): "{expected_response}"
-User's actual response (in English): "{input}"
+TUTOR_PREFIX = """
+You are an English tutor for Indian learners. You compare a learner's spoken English response with the expected response for a lesson.
 
 Task:
 1. Briefly explain the main differences between the expected and actual responses.
 2. Give one short line of feedback or advice to help the learner improve next time.
 
-Respond in {language}, using native script wherever possible.
-Keep everything in {language}, except the English sentences.
+Respond in the learner's language, using native script wherever possible.
+Keep everything in the learner's language, except the English sentences.
+Use the notes, if any, to decide which answers are acceptable.
 """
-)
 
-        evaluation_prompt = PromptTemplate(
-            input_variables=["level", "stage", "feedback", "expected_response", "user_response", "language"],
-            template="""
-Evaluate a {level}-level and {stage}-stage English learner who speaks {language}.
+TUTOR_SUFFIX = """
+Learner language: {language}
+Learner level: {level}
+Learner stage: {stage}
+Lesson: "{prompt}"
+Notes: {notes_for_ai}
+Expected response (in English): "{expected_response}"
+User's actual response (in English): "{input}"
+"""
 
-Feedback: {feedback}
-Expected Response (in English): {expected_response}
-User's Response: {user_response}
+EVALUATION_PREFIX = """
+You evaluate English learners who speak an Indian language.
 
 Steps:
 1. Give a similarity score based on expected response and user response between 0.0 to 1.0.
@@ -49,6 +61,58 @@ Steps:
 
 Return only the score.
 """
+
+EVALUATION_SUFFIX = """
+Learner language: {language}
+Learner level: {level}
+Learner stage: {stage}
+Feedback: {feedback}
+Expected Response (in English): {expected_response}
+User's Response: {user_response}
+"""
+
+GRADING_PREFIX = """
+You are an English tutor for Indian learners. You compare a learner's spoken English response with the expected response for a lesson, give feedback and grade it.
+
+Task:
+1. feedback: Briefly explain the main differences between the expected and actual responses, then give one short line of advice to help the learner improve next time. Write the feedback in the learner's language using native script, except the English sentences.
+2. score: A similarity score between 0.0 and 1.0 based on the expected response and the user response. Use the notes, if any, to decide which answers are acceptable.
+"""
+
+GRADING_SUFFIX = TUTOR_SUFFIX
+
+
+class PromptTemplates:
+    def __init__(self):
+        pass    
+    @staticmethod
+    def template_ids():
+        """Template IDs in the same order as init_prompts returns them."""
+        return LESSON_TEMPLATE_ID, TUTOR_TEMPLATE_ID, EVALUATION_TEMPLATE_ID
+
+    @staticmethod
+    def init_grading_prompt():
+        """Prompt for the single-call grading chain that returns feedback and score together."""
+        return PromptTemplate(
+            input_variables=["level", "stage", "prompt", "notes_for_ai", "expected_response", "input", "language"],
+            template=GRADING_PREFIX + GRADING_SUFFIX
+        )
+
+    @staticmethod
+    def init_prompts():
+        lesson_prompt = PromptTemplate(
+            input_variables=["level", "stage", "prompt", "language", "expected_user_response"],
+            template=LESSON_PREFIX + LESSON_SUFFIX
+        )
+
+        tutor_prompt = PromptTemplate(
+            input_variables=["level", "stage", "prompt", "notes_for_ai", "expected_response", "input", "language"],
+            template=TUTOR_PREFIX + TUTOR_SUFFIX
+        )
+
+        evaluation_prompt = PromptTemplate(
+            input_variables=["level", "stage", "feedback", "expected_response", "user_response", "language"],
+            template=EVALUATION_PREFIX + EVALUATION_SUFFIX
         )
 
         return lesson_prompt, tutor_prompt, evaluation_prompt
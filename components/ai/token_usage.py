@@ -0,0 +1,99 @@
+import threading
+import time
+from typing import Any, Dict, List
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+class TokenUsageTracker(BaseCallbackHandler):
+    """Callback handler that accumulates token usage and latency per template ID.
+
+    Chains attach a ``template_id`` through the model's metadata; calls without one
+    are recorded under ``"unknown"``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._runs: Dict[Any, tuple] = {}
+        self.totals: Dict[str, Dict[str, float]] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, metadata)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, metadata)
+
+    def _start(self, run_id, metadata):
+        template_id = (metadata or {}).get("template_id", "unknown")
+        with self._lock:
+            self._runs[run_id] = (template_id, time.perf_counter())
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            self._runs.pop(run_id, None)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            template_id, started = self._runs.pop(run_id, ("unknown", time.perf_counter()))
+        usage = self._extract_usage(response)
+        usage["latency_s"] = time.perf_counter() - started
+
+        with self._lock:
+            totals = self.totals.setdefault(template_id, {
+                "calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                "cached_tokens": 0, "latency_s": 0.0,
+            })
+            totals["calls"] += 1
+            for key in ("prompt_tokens", "completion_tokens", "cached_tokens", "latency_s"):
+                totals[key] += usage[key]
+
+    @staticmethod
+    def _extract_usage(response) -> Dict[str, Any]:
+        """Read prompt, completion and cached token counts from an LLMResult."""
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                metadata = getattr(message, "usage_metadata", None)
+                if metadata:
+                    details = metadata.get("input_token_details") or {}
+                    return {
+                        "prompt_tokens": metadata.get("input_tokens", 0),
+                        "completion_tokens": metadata.get("output_tokens", 0),
+                        "cached_tokens": details.get("cache_read", 0) or 0,
+                    }
+
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        details = token_usage.get("prompt_tokens_details") or {}
+        return {
+            "prompt_tokens": token_usage.get("prompt_tokens", 0),
+            "completion_tokens": token_usage.get("completion_tokens", 0),
+            "cached_tokens": details.get("cached_tokens", 0) or 0,
+        }
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per-template totals plus mean latency and cache hit ratio."""
+        with self._lock:
+            summary = {}
+            for template_id, totals in self.totals.items():
+                calls = totals["calls"] or 1
+                prompt_tokens = totals["prompt_tokens"] or 1
+                summary[template_id] = {
+                    **totals,
+                    "mean_latency_s": totals["latency_s"] / calls,
+                    "cache_hit_ratio": totals["cached_tokens"] / prompt_tokens,
+                }
+            return summary
+
+    def summary_rows(self) -> List[Dict[str, Any]]:
+        """Rows of per-template usage suitable for st.dataframe or printing."""
+        return [
+            {
+                "template_id": template_id,
+                "calls": stats["calls"],
+                "prompt_tokens": stats["prompt_tokens"],
+                "completion_tokens": stats["completion_tokens"],
+                "cache_hit_ratio": round(stats["cache_hit_ratio"], 3),
+                "mean_latency_s": round(stats["mean_latency_s"], 2),
+            }
+            for template_id, stats in sorted(self.summary().items())
+        ]
@@ -1,10 +1,32 @@
+import hashlib
+import uuid
+
 import streamlit as st 
 
+from components.session.store import get_session_store, serialize_state
+from database.user_progress_db import READ_YOUR_WRITES_WINDOW, last_write_at, record_write
+
+# State that is saved to the session store so any worker can continue the
+# lesson. Audio, recordings and in-flight flags are per-worker and rebuilt.
+# Authentication is never saved: the session ID travels in the URL, so a
+# snapshot is only applied after its owner logs in again.
+PERSISTED_KEYS = (
+    'prompt_id',
+    'lesson_started',
+    'current_lesson',
+    'show_feedback',
+    'feedback_data',
+    'last_toast_prompt',
+    'last_write_at',
+)
+
 
 class Session:
-    def __init__(self):
-        pass
+    def __init__(self, store=None):
+        self.store = store if store is not None else get_session_store()
+
     def init_session_state(self):
+        self._restore()
         if 'authenticated' not in st.session_state:
             st.session_state.authenticated = False
         if 'user_id' not in st.session_state:
@@ -17,14 +39,24 @@ class Session:
             st.session_state.audio_saved = False
         if 'prompt_id' not in st.session_state:
             st.session_state.prompt_id = None
+        if 'recording_id' not in st.session_state:
+            st.session_state.recording_id = None
+        if 'recording_bytes' not in st.session_state:
+            st.session_state.recording_bytes = None
+        if 'speech_analysis' not in st.session_state:
+            st.session_state.speech_analysis = None
         if 'show_feedback' not in st.session_state:
             st.session_state.show_feedback = False
         if 'feedback_data' not in st.session_state:
             st.session_state.feedback_data = {}
+        if 'lesson_audio' not in st.session_state:
+            st.session_state.lesson_audio = None
         if 'ran_expected_audio' not in st.session_state:
             st.session_state.ran_expected_audio = False
         if "continue_clicked" not in st.session_state:
             st.session_state.continue_clicked = False
+        if 'user_context' not in st.session_state:
+            st.session_state.user_context = None
         if 'last_toast_prompt' not in st.session_state:
             st.session_state.last_toast_prompt = -1
 
@@ -32,6 +64,120 @@ class Session:
         st.session_state.lesson_started = False
         st.session_state.current_lesson = None
         st.session_state.audio_saved = False
+        st.session_state.recording_id = None
+        st.session_state.recording_bytes = None
+        st.session_state.speech_analysis = None
         st.session_state.show_feedback = False
         st.session_state.feedback_data = {}
-        st.session_state.ran_expected_audio = False
\ No newline at end of file
+        st.session_state.lesson_audio = None
+        st.session_state.ran_expected_audio = False
+
+    def _restore(self):
+        """
+        Pick up this browser session's ID once per worker.
+
+        The session ID travels in the ``sid`` query parameter, so a reload or
+        a request routed to another worker finds the same snapshot once the
+        learner has logged in.
+        """
+        if 'session_id' in st.session_state:
+            return
+        session_id = st.query_params.get("sid")
+        if session_id:
+            # A write made on another worker keeps this user's reads on the
+            # primary here too, even before they log in again.
+            snapshot = self._load(session_id)
+            if snapshot and snapshot.get('state', {}).get('last_write_at'):
+                record_write(snapshot['owner'], snapshot['state']['last_write_at'])
+        else:
+            session_id = self._new_session_id()
+        st.session_state.session_id = session_id
+        st.session_state.session_digest = None
+        st.session_state.session_owner = None
+
+    def _new_session_id(self):
+        session_id = uuid.uuid4().hex
+        st.query_params["sid"] = session_id
+        return session_id
+
+    def _load(self, session_id):
+        if self.store is None:
+            return None
+        try:
+            return self.store.get(session_id)
+        except Exception as e:
+            print(f"Error loading session: {e}")
+            return None
+
+    def _delete(self, session_id):
+        if self.store is None:
+            return
+        try:
+            self.store.delete(session_id)
+        except Exception as e:
+            print(f"Error deleting session: {e}")
+
+    def login(self):
+        """
+        Bind the session to the user who just logged in.
+
+        The lesson state saved under the current session ID is restored only
+        if it belongs to the same user and is for the prompt the database
+        has them on. The session is then moved to a fresh
+        ID, so a link shared or planted before login can't reach it.
+        """
+        user_id = st.session_state.user_id
+        old_session_id = st.session_state.session_id
+        st.session_state.user_context = None
+        snapshot = self._load(old_session_id)
+        if snapshot and snapshot.get('owner') == user_id:
+            state = snapshot.get('state', {})
+            # The database decides progress: a snapshot for another prompt
+            # (e.g. an old tab after progress elsewhere) is dropped.
+            if state.get('prompt_id') == st.session_state.prompt_id:
+                for key, value in state.items():
+                    st.session_state[key] = value
+        self._delete(old_session_id)
+
+        st.session_state.session_id = self._new_session_id()
+        st.session_state.session_digest = None
+        st.session_state.session_owner = user_id
+
+    def logout(self):
+        """Drop the saved session and start a new, anonymous one."""
+        user_id = st.session_state.session_owner
+        self._delete(st.session_state.session_id)
+        st.session_state.session_id = self._new_session_id()
+        st.session_state.session_digest = None
+        st.session_state.session_owner = None
+
+        # Keep only the write marker, briefly, so an immediate re-login on
+        # another worker still reads the progress just saved.
+        marker = last_write_at(user_id) if user_id else None
+        if self.store is not None and marker:
+            try:
+                self.store.put(
+                    st.session_state.session_id,
+                    {'owner': user_id, 'state': {'last_write_at': marker}},
+                    ttl=int(READ_YOUR_WRITES_WINDOW) + 1,
+                )
+            except Exception as e:
+                print(f"Error saving session: {e}")
+
+    def persist(self):
+        """Save the persisted keys to the store if they changed since the last save."""
+        if self.store is None or not st.session_state.get('session_owner'):
+            return
+        st.session_state.last_write_at = last_write_at(st.session_state.session_owner)
+        snapshot = {
+            'owner': st.session_state.session_owner,
+            'state': {key: st.session_state.get(key) for key in PERSISTED_KEYS},
+        }
+        try:
+            digest = hashlib.sha1(serialize_state(snapshot)).hexdigest()
+            if digest == st.session_state.session_digest:
+                return
+            self.store.put(st.session_state.session_id, snapshot)
+            st.session_state.session_digest = digest
+        except Exception as e:
+            print(f"Error saving session: {e}")
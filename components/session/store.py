@@ -0,0 +1,123 @@
+import json
+import os
+import sqlite3
+import time
+import zlib
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+# How long a learner's session survives without activity.
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", 12 * 3600))
+
+
+def serialize_state(state: Dict[str, Any]) -> bytes:
+    """Compact form of a session snapshot: compressed JSON."""
+    return zlib.compress(json.dumps(state, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+
+def deserialize_state(data: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+class SessionStore(ABC):
+    """Server-side storage for session snapshots, keyed by session ID."""
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def put(self, session_id: str, state: Dict[str, Any], ttl: int = SESSION_TTL_SECONDS) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        ...
+
+
+class SQLiteSessionStore(SessionStore):
+    """Session store in a local SQLite file, shared by every worker on the host."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ui_sessions (
+                    session_id TEXT PRIMARY KEY,
+                    data BLOB NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS ui_sessions_expires_at ON ui_sessions (expires_at)")
+
+    @contextmanager
+    def _connect(self):
+        # sqlite3's own context manager commits but never closes
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, session_id):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data FROM ui_sessions WHERE session_id = ? AND expires_at > ?",
+                (session_id, time.time())
+            ).fetchone()
+        return deserialize_state(row[0]) if row else None
+
+    def put(self, session_id, state, ttl=SESSION_TTL_SECONDS):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO ui_sessions (session_id, data, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT (session_id) DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at
+                """,
+                (session_id, serialize_state(state), now + ttl)
+            )
+            conn.execute("DELETE FROM ui_sessions WHERE expires_at <= ?", (now,))
+
+    def delete(self, session_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM ui_sessions WHERE session_id = ?", (session_id,))
+
+
+class PostgresSessionStore(SessionStore):
+    """Session store in the application's Postgres primary, shared across hosts."""
+
+    def __init__(self, db=None):
+        from database.user_progress_db import UserProgressDB
+
+        self.db = db or UserProgressDB()
+
+    def get(self, session_id):
+        data = self.db.get_ui_session(session_id)
+        return deserialize_state(data) if data else None
+
+    def put(self, session_id, state, ttl=SESSION_TTL_SECONDS):
+        self.db.put_ui_session(session_id, serialize_state(state), ttl)
+
+    def delete(self, session_id):
+        self.db.delete_ui_session(session_id)
+
+
+def get_session_store() -> Optional[SessionStore]:
+    """
+    Build the store selected by SESSION_STORE.
+
+    SESSION_STORE is "sqlite" (default, file at SESSION_SQLITE_PATH),
+    "postgres", or "none" to keep sessions in process memory only.
+    """
+    kind = os.getenv("SESSION_STORE", "sqlite").lower()
+    if kind == "none":
+        return None
+    if kind == "postgres":
+        return PostgresSessionStore()
+    if kind == "sqlite":
+        return SQLiteSessionStore(os.getenv("SESSION_SQLITE_PATH", "sessions.sqlite3"))
+    raise ValueError(f"Unknown SESSION_STORE: {kind}")
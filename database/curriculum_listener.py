@@ -0,0 +1,91 @@
+import json
+import select
+import threading
+import time
+from typing import Optional
+
+from database.user_progress_db import CURRICULUM_CHANNEL
+from utils.curriculum_cache import evict_prompt, record_edits
+
+POLL_INTERVAL = 5.0
+MAX_BACKOFF = 60.0
+
+
+class CurriculumListener(threading.Thread):
+    """
+    Background thread that LISTENs for curriculum changes and evicts caches.
+
+    Each notification evicts the changed prompt_id from every curriculum
+    cache in this process and marks its prebuilt bundle content stale. On
+    every connect the edit log is reloaded, and after a dropped connection
+    all caches are cleared, since notifications sent while disconnected are
+    lost.
+    """
+
+    def __init__(self, db):
+        super().__init__(name="curriculum-listener", daemon=True)
+        self.db = db
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        backoff = 1.0
+        connected_before = False
+        while not self._stop_event.is_set():
+            conn = None
+            try:
+                conn = self.db.connect_listener()
+                cursor = conn.cursor()
+                cursor.execute(f"LISTEN {CURRICULUM_CHANNEL}")
+                # Read the edit log only once LISTENing, so no edit falls in
+                # between; it covers edits made before this process started.
+                record_edits(self.db.get_curriculum_edits())
+                if connected_before:
+                    evict_prompt(None)
+                connected_before = True
+                backoff = 1.0
+                self._listen(conn, cursor)
+            except Exception as e:
+                # Keep the thread alive whatever broke the connection
+                print(f"Curriculum listener disconnected, retrying in {backoff:.0f}s: {e}")
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+            finally:
+                if conn:
+                    conn.close()
+
+    def _listen(self, conn, cursor):
+        while not self._stop_event.is_set():
+            if select.select([conn], [], [], POLL_INTERVAL) == ([], [], []):
+                # Idle: make sure the connection is still alive. Notifications
+                # that arrive with the reply land in conn.notifies.
+                cursor.execute("SELECT 1")
+            else:
+                conn.poll()
+            while conn.notifies:
+                self._handle(conn.notifies.pop(0).payload)
+
+    @staticmethod
+    def _handle(payload: str):
+        try:
+            prompt_id = json.loads(payload).get("prompt_id")
+        except ValueError:
+            prompt_id = None
+        record_edits({prompt_id: time.time()})
+        evict_prompt(prompt_id)
+
+
+_listener: Optional[CurriculumListener] = None
+_listener_lock = threading.Lock()
+
+
+def start_curriculum_listener(db) -> CurriculumListener:
+    """Start the process-wide listener once and return it."""
+    global _listener
+    with _listener_lock:
+        if _listener is None or not _listener.is_alive():
+            _listener = CurriculumListener(db)
+            _listener.start()
+        return _listener
@@ -0,0 +1,25 @@
+"""Apply the schema changes the app expects on top of the base tables.
+
+Run once per deploy, before starting the app workers, as a role that owns
+the lessons, prompts and promptID tables.
+
+Usage:
+    python -m database.migrate
+"""
+import sys
+
+from database.user_progress_db import UserProgressDB
+
+
+def main():
+    db = UserProgressDB()
+    try:
+        db.migrate()
+    except Exception as e:
+        print(f"Error migrating database: {e}")
+        sys.exit(1)
+    print("Database schema is up to date.")
+
+
+if __name__ == "__main__":
+    main()
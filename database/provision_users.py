@@ -0,0 +1,81 @@
+"""Provision learner accounts in bulk from a roster CSV.
+
+The roster needs user_id, name, password and language columns (language is
+a Sarvam language code such as hi, ta or bn). Invalid rows are reported and
+left out; valid rows are loaded with COPY and inserted in one statement.
+
+Usage:
+    python -m database.provision_users roster.csv
+    python -m database.provision_users roster.csv --dry-run
+"""
+import argparse
+import csv
+import sys
+import time
+
+from database.user_progress_db import UserProgressDB
+
+REQUIRED_COLUMNS = ("user_id", "name", "password", "language")
+LANGUAGES = {"hi", "bn", "ta", "te", "kn", "ml", "mr", "gu", "pa", "od", "en"}
+MAX_LENGTH = 255
+
+
+def validate_roster(rows):
+    """
+    Split roster rows into valid users and invalid rows with reasons.
+
+    Returns:
+        tuple: (list of user dicts, list of (line number, reason))
+    """
+    valid, invalid = [], []
+    seen_ids, seen_names = set(), set()
+    # Line 1 is the header
+    for line, row in enumerate(rows, start=2):
+        user = {column: (row.get(column) or "").strip() for column in REQUIRED_COLUMNS}
+        missing = [column for column in REQUIRED_COLUMNS if not user[column]]
+        if missing:
+            invalid.append((line, f"missing {', '.join(missing)}"))
+        elif any(len(value) > MAX_LENGTH for value in user.values()):
+            invalid.append((line, f"value longer than {MAX_LENGTH} characters"))
+        elif user["language"] not in LANGUAGES:
+            invalid.append((line, f"unknown language '{user['language']}'"))
+        elif user["user_id"] in seen_ids:
+            invalid.append((line, f"duplicate user_id '{user['user_id']}' in roster"))
+        elif user["name"] in seen_names:
+            invalid.append((line, f"duplicate name '{user['name']}' in roster"))
+        else:
+            seen_ids.add(user["user_id"])
+            seen_names.add(user["name"])
+            valid.append(user)
+    return valid, invalid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("roster", help="CSV file with user_id, name, password, language")
+    parser.add_argument("--dry-run", action="store_true", help="Validate the roster without writing")
+    args = parser.parse_args()
+
+    with open(args.roster, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            sys.exit(f"Roster is missing columns: {', '.join(missing)}")
+        users, invalid = validate_roster(reader)
+
+    for line, reason in invalid:
+        print(f"line {line}: {reason}")
+
+    created, skipped = [], []
+    start = time.perf_counter()
+    if users and not args.dry_run:
+        result = UserProgressDB().bulk_create_users(users)
+        created, skipped = result["created"], result["skipped"]
+    elapsed = time.perf_counter() - start
+
+    print(f"created: {len(created)}, skipped (already exist): {len(skipped)}, invalid: {len(invalid)}"
+          + (f", valid: {len(users)} (dry run)" if args.dry_run else f" in {elapsed:.2f}s"))
+
+
+if __name__ == "__main__":
+    main()
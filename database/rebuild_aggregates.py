@@ -0,0 +1,19 @@
+"""Backfill the user_stats and user_prompt_stats tables from lesson history.
+
+Usage:
+    python -m database.rebuild_aggregates
+"""
+import sys
+
+from database.user_progress_db import UserProgressDB
+
+
+def main():
+    db = UserProgressDB()
+    if not db.rebuild_aggregates():
+        sys.exit(1)
+    print("Aggregates rebuilt from lesson history.")
+
+
+if __name__ == "__main__":
+    main()
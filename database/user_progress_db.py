@@ -1,4 +1,9 @@
 import os
+import csv
+import io
+import itertools
+import threading
+import time
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from datetime import datetime
@@ -6,14 +11,120 @@ from typing import Dict, List, Any, Optional
 from contextlib import contextmanager
 from dotenv import load_dotenv
 
+from utils.curriculum_cache import CurriculumCache
+
 load_dotenv()
 
+# Reads for a user go to the primary for this long after that user's last
+# write, so replica lag never shows a learner stale progress.
+READ_YOUR_WRITES_WINDOW = 5.0
+# How long a replica that refused a connection is skipped before it is retried.
+REPLICA_RETRY_INTERVAL = 30.0
+REPLICA_CONNECT_TIMEOUT = 3
+
+# Channel the curriculum triggers notify on; see database.curriculum_listener.
+CURRICULUM_CHANNEL = "curriculum_changed"
+
+prompt_rows = CurriculumCache("prompt_rows")
+
+# Wall-clock time of each user's last write, shared by every UserProgressDB
+# in the process. The session also saves it (see components.session) so
+# another worker can seed it with record_write.
+_last_write: Dict[str, float] = {}
+_last_write_lock = threading.Lock()
+
+
+def record_write(consistency_key: str, at: Optional[float] = None) -> None:
+    """Note a write for a user; reads for them stay on the primary for READ_YOUR_WRITES_WINDOW."""
+    at = at if at is not None else time.time()
+    with _last_write_lock:
+        if at > _last_write.get(consistency_key, 0):
+            _last_write[consistency_key] = at
+
+
+def last_write_at(consistency_key: str) -> Optional[float]:
+    """Wall-clock time of the user's last write seen by this process, if any."""
+    with _last_write_lock:
+        return _last_write.get(consistency_key)
+
+
+# Statements that record one attempt, shared by record_attempt and the
+# single-statement advance_lesson. They run as CTEs of one statement, so
+# all of them see user_prompt_stats as it was before this attempt.
+_PRIOR_PROMPT_STATS_SQL = """
+    SELECT completed_at FROM user_prompt_stats
+    WHERE user_id = %(user_id)s AND prompt_id = %(prompt_id)s
+"""
+
+_INSERT_ATTEMPT_SQL = """
+    INSERT INTO lessons (user_id, prompt_id, ai_feedback, score, attempted_at, completed_at)
+    VALUES (%(user_id)s, %(prompt_id)s::VARCHAR, %(feedback)s, %(score)s, %(now)s, %(completed_at)s)
+"""
+
+_UPSERT_USER_STATS_SQL = """
+    INSERT INTO user_stats AS s (user_id, attempts, completions, completed_prompts, score_sum,
+                                 best_score, first_attempt_at, last_attempt_at, last_completed_at)
+    VALUES (
+        %(user_id)s, 1, %(done)s,
+        -- A prompt counts once, when its completed_at goes from NULL to set
+        CASE WHEN %(done)s = 1 AND NOT EXISTS (SELECT 1 FROM prior_prompt WHERE completed_at IS NOT NULL)
+             THEN 1 ELSE 0 END,
+        %(score)s, %(score)s, %(now)s, %(now)s, %(completed_at)s
+    )
+    ON CONFLICT (user_id) DO UPDATE SET
+        attempts = s.attempts + 1,
+        completions = s.completions + EXCLUDED.completions,
+        completed_prompts = s.completed_prompts + EXCLUDED.completed_prompts,
+        score_sum = s.score_sum + EXCLUDED.score_sum,
+        best_score = GREATEST(s.best_score, EXCLUDED.best_score),
+        last_attempt_at = EXCLUDED.last_attempt_at,
+        last_completed_at = COALESCE(EXCLUDED.last_completed_at, s.last_completed_at)
+"""
+
+_UPSERT_PROMPT_STATS_SQL = """
+    INSERT INTO user_prompt_stats AS s (user_id, prompt_id, attempts, score_sum, best_score,
+                                        first_attempt_at, last_attempt_at, completed_at)
+    VALUES (%(user_id)s, %(prompt_id)s, 1, %(score)s, %(score)s, %(now)s, %(now)s, %(completed_at)s)
+    ON CONFLICT (user_id, prompt_id) DO UPDATE SET
+        attempts = s.attempts + 1,
+        score_sum = s.score_sum + EXCLUDED.score_sum,
+        best_score = GREATEST(s.best_score, EXCLUDED.best_score),
+        last_attempt_at = EXCLUDED.last_attempt_at,
+        completed_at = COALESCE(s.completed_at, EXCLUDED.completed_at)
+"""
+
+_RECORD_ATTEMPT_CTES = f"""
+    prior_prompt AS ({_PRIOR_PROMPT_STATS_SQL}),
+    attempt AS ({_INSERT_ATTEMPT_SQL}),
+    user_agg AS ({_UPSERT_USER_STATS_SQL}),
+    prompt_agg AS ({_UPSERT_PROMPT_STATS_SQL})
+"""
+
+
+# Recount completed_prompts from user_prompt_stats, for backfills and rebuilds.
+_FILL_COMPLETED_PROMPTS_SQL = """
+    UPDATE user_stats s SET completed_prompts = p.completed
+    FROM (
+        SELECT user_id, COUNT(*) AS completed FROM user_prompt_stats
+        WHERE completed_at IS NOT NULL GROUP BY user_id
+    ) p
+    WHERE p.user_id = s.user_id
+"""
+
 
 class UserProgressDB:
     """Database manager for user progress and learning data."""
     
-    def __init__(self):
-        """Initialize the user progress database."""
+    def __init__(self, primary_dsn: Optional[str] = None, replica_dsns: Optional[List[str]] = None):
+        """
+        Initialize the user progress database.
+
+        Args:
+            primary_dsn: DSN for the primary; defaults to POSTGRES_DSN or the
+                POSTGRES_* connection variables
+            replica_dsns: DSNs for read replicas; defaults to the
+                comma-separated POSTGRES_REPLICA_DSNS
+        """
         self.conn_params = {
             "dbname": os.getenv("POSTGRES_DB"),
             "user": os.getenv("POSTGRES_USER"),
@@ -21,25 +132,44 @@ class UserProgressDB:
             "host": os.getenv("POSTGRES_HOST"),
             "port": os.getenv("POSTGRES_PORT")
         }
+        self.primary_dsn = primary_dsn or os.getenv("POSTGRES_DSN")
+        if replica_dsns is None:
+            replica_dsns = [dsn.strip() for dsn in os.getenv("POSTGRES_REPLICA_DSNS", "").split(",") if dsn.strip()]
+        self.replica_dsns = replica_dsns
+
+        self._replica_cycle = itertools.cycle(range(len(self.replica_dsns)))
+        self._replica_down_until: Dict[int, float] = {}
+        self._routing_lock = threading.Lock()
+
         self._create_tables_if_not_exist()
 
     # Context Manager for Database Connections
     @contextmanager
-    def _get_connection(self, dict_cursor: bool = False):
+    def _get_connection(self, dict_cursor: bool = False, read_only: bool = False,
+                        consistency_key: Optional[str] = None):
         """
         Context manager for database connections.
         
         Args:
             dict_cursor: If True, returns results as dictionaries.
+            read_only: If True, the connection may be served by a replica.
+            consistency_key: User the statement reads or writes. Writes
+                record it; reads for it stay on the primary for
+                READ_YOUR_WRITES_WINDOW seconds afterwards.
             
         Yields:
             tuple: (connection, cursor) objects
         """
         conn = None
         try:
-            conn = psycopg2.connect(**self.conn_params)
+            if read_only and not self._wrote_recently(consistency_key):
+                conn = self._connect_replica()
+            if conn is None:
+                conn = self._connect_primary()
             cursor = conn.cursor(cursor_factory=RealDictCursor) if dict_cursor else conn.cursor()
             yield conn, cursor
+            if not read_only and consistency_key is not None:
+                record_write(consistency_key)
         except Exception as e:
             if conn:
                 conn.rollback()
@@ -48,6 +178,63 @@ class UserProgressDB:
             if conn:
                 conn.close()
 
+    def _connect_primary(self):
+        if self.primary_dsn:
+            return psycopg2.connect(self.primary_dsn)
+        return psycopg2.connect(**self.conn_params)
+
+    def connect_listener(self):
+        """
+        Open a long-lived autocommit connection to the primary for LISTEN.
+
+        Notifications are only delivered outside a transaction, so the
+        connection is returned in autocommit mode. The caller owns it and
+        must close it.
+
+        Returns:
+            A psycopg2 connection to the primary
+        """
+        conn = self._connect_primary()
+        conn.autocommit = True
+        return conn
+
+    def _connect_replica(self):
+        """
+        Connect to the next healthy replica in round-robin order.
+
+        Replicas that refuse a connection are skipped for
+        REPLICA_RETRY_INTERVAL seconds.
+
+        Returns:
+            A connection, or None if no replica is configured or reachable
+        """
+        for _ in range(len(self.replica_dsns)):
+            with self._routing_lock:
+                index = next(self._replica_cycle)
+                if self._replica_down_until.get(index, 0) > time.monotonic():
+                    continue
+            try:
+                conn = psycopg2.connect(self.replica_dsns[index], connect_timeout=REPLICA_CONNECT_TIMEOUT)
+                conn.set_session(readonly=True)
+                return conn
+            except psycopg2.OperationalError as e:
+                print(f"Replica {index} unavailable, skipping for {REPLICA_RETRY_INTERVAL:.0f}s: {e}")
+                with self._routing_lock:
+                    self._replica_down_until[index] = time.monotonic() + REPLICA_RETRY_INTERVAL
+        return None
+
+    def _wrote_recently(self, consistency_key: Optional[str]) -> bool:
+        if consistency_key is None:
+            return False
+        with _last_write_lock:
+            last_write = _last_write.get(consistency_key)
+            if last_write is None:
+                return False
+            if time.time() - last_write > READ_YOUR_WRITES_WINDOW:
+                del _last_write[consistency_key]
+                return False
+            return True
+
     # Table Setup
     def _create_tables_if_not_exist(self):
         """Create necessary tables if they don't exist."""
@@ -57,6 +244,26 @@ class UserProgressDB:
             self._create_user_feedback_table(cursor)
             self._create_promptID_table(cursor)
             conn.commit()
+
+    def migrate(self):
+        """
+        Apply the schema added on top of the base tables.
+
+        Run once per deploy with ``python -m database.migrate``, not from
+        the constructor: it alters existing tables and replaces the
+        curriculum triggers, which needs table-owner rights and must not race
+        between workers starting together.
+        """
+        with self._get_connection() as (conn, cursor):
+            cursor.execute("ALTER TABLE lessons ADD COLUMN IF NOT EXISTS score REAL")
+            cursor.execute("ALTER TABLE lessons ADD COLUMN IF NOT EXISTS attempted_at TIMESTAMP DEFAULT NOW()")
+            self._create_user_stats_table(cursor)
+            self._create_user_prompt_stats_table(cursor)
+            self._add_completed_prompts_column(cursor)
+            self._create_ui_sessions_table(cursor)
+            self._create_curriculum_edits_table(cursor)
+            self._create_curriculum_triggers(cursor)
+            conn.commit()
     
     def _create_users_table(self, cursor):
         """Create the users table."""
@@ -103,6 +310,112 @@ class UserProgressDB:
                 stage VARCHAR(50)
             )
         """)
+
+    def _create_user_stats_table(self, cursor):
+        """Create the per-user aggregate table."""
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS user_stats (
+                user_id VARCHAR(255) PRIMARY KEY REFERENCES users(user_id),
+                attempts INTEGER NOT NULL DEFAULT 0,
+                completions INTEGER NOT NULL DEFAULT 0,
+                completed_prompts INTEGER NOT NULL DEFAULT 0,
+                score_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+                best_score REAL,
+                first_attempt_at TIMESTAMP,
+                last_attempt_at TIMESTAMP,
+                last_completed_at TIMESTAMP
+            )
+        """)
+
+    def _add_completed_prompts_column(self, cursor):
+        """Add user_stats.completed_prompts to tables created before it, backfilled once."""
+        cursor.execute("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'user_stats' AND column_name = 'completed_prompts'
+              AND table_schema = current_schema()
+        """)
+        if cursor.fetchone():
+            return
+        cursor.execute("ALTER TABLE user_stats ADD COLUMN completed_prompts INTEGER NOT NULL DEFAULT 0")
+        cursor.execute(_FILL_COMPLETED_PROMPTS_SQL)
+
+    def _create_user_prompt_stats_table(self, cursor):
+        """Create the per-user, per-prompt aggregate table."""
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS user_prompt_stats (
+                user_id VARCHAR(255) REFERENCES users(user_id),
+                prompt_id INTEGER,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                score_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+                best_score REAL,
+                first_attempt_at TIMESTAMP,
+                last_attempt_at TIMESTAMP,
+                completed_at TIMESTAMP,
+                PRIMARY KEY (user_id, prompt_id)
+            )
+        """)
+
+    def _create_ui_sessions_table(self, cursor):
+        """Create the table behind components.session.store.PostgresSessionStore."""
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ui_sessions (
+                session_id VARCHAR(64) PRIMARY KEY,
+                data BYTEA NOT NULL,
+                expires_at TIMESTAMP NOT NULL
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS ui_sessions_expires_at ON ui_sessions (expires_at)")
+
+    def _create_curriculum_edits_table(self, cursor):
+        """Create the log of curriculum edits; a NULL prompt_id means every prompt (TRUNCATE)."""
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS curriculum_edits (
+                id BIGSERIAL PRIMARY KEY,
+                prompt_id INTEGER,
+                edited_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+        """)
+
+    def _create_curriculum_triggers(self, cursor):
+        """
+        Log and notify every change to prompts or promptID rows (PostgreSQL 14+).
+
+        Each change is appended to `curriculum_edits` and sent on
+        CURRICULUM_CHANNEL with the prompt_id.
+        """
+        cursor.execute(f"""
+            CREATE OR REPLACE FUNCTION notify_curriculum_change() RETURNS trigger AS $$
+            BEGIN
+                IF TG_LEVEL = 'STATEMENT' THEN
+                    -- TRUNCATE: every prompt is affected
+                    INSERT INTO curriculum_edits (prompt_id) VALUES (NULL);
+                    PERFORM pg_notify('{CURRICULUM_CHANNEL}', json_build_object('table', TG_TABLE_NAME)::text);
+                    RETURN NULL;
+                END IF;
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    INSERT INTO curriculum_edits (prompt_id) VALUES (OLD.prompt_id);
+                    PERFORM pg_notify('{CURRICULUM_CHANNEL}',
+                        json_build_object('table', TG_TABLE_NAME, 'prompt_id', OLD.prompt_id)::text);
+                END IF;
+                IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.prompt_id IS DISTINCT FROM OLD.prompt_id) THEN
+                    INSERT INTO curriculum_edits (prompt_id) VALUES (NEW.prompt_id);
+                    PERFORM pg_notify('{CURRICULUM_CHANNEL}',
+                        json_build_object('table', TG_TABLE_NAME, 'prompt_id', NEW.prompt_id)::text);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        for table in ("prompts", "promptID"):
+            cursor.execute(f"""
+                CREATE OR REPLACE TRIGGER {table}_curriculum_change
+                    AFTER INSERT OR UPDATE OR DELETE ON {table}
+                    FOR EACH ROW EXECUTE FUNCTION notify_curriculum_change();
+                CREATE OR REPLACE TRIGGER {table}_curriculum_truncate
+                    AFTER TRUNCATE ON {table}
+                    FOR EACH STATEMENT EXECUTE FUNCTION notify_curriculum_change();
+            """)
+
     # User Management Methods
     def create_user(self, user_id: str, name: Optional[str] = None) -> bool:
         """
@@ -116,15 +429,15 @@ class UserProgressDB:
             bool: True if user created successfully, False if user already exists
         """
         try:
-            with self._get_connection() as (conn, cursor):
+            with self._get_connection(consistency_key=user_id) as (conn, cursor):
                 # Check if user already exists
                 cursor.execute("SELECT user_id FROM users WHERE user_id = %s", (user_id,))
                 if cursor.fetchone():
                     return False  # User already exists
                 
                 cursor.execute(
-                    "INSERT INTO users (user_id, name, current_level, current_stage, lesson_level) VALUES (%s, %s, %s, %s, %s)",
-                    (user_id, name, "Beginner", "L1", 1)
+                    "INSERT INTO users (user_id, name, current_level, current_stage) VALUES (%s, %s, %s, %s)",
+                    (user_id, name, "Beginner", "L1")
                 )
                 conn.commit()
                 return True
@@ -132,6 +445,58 @@ class UserProgressDB:
             print(f"Error creating user: {e}")
             return False
     
+    def bulk_create_users(self, users: List[Dict[str, str]]) -> Dict[str, Any]:
+        """
+        Create many users in one set-based statement.
+
+        Rows are streamed into a temporary staging table with COPY and
+        inserted in a single INSERT ... SELECT. Users whose user_id or name
+        already exists are skipped. New users start at the first prompt in
+        the `promptID` table, with `current_level` taken from its stage and
+        `current_stage` from its level, as in create_user.
+
+        Args:
+            users: Validated rows with user_id, name, password and language
+
+        Returns:
+            Dict[str, Any]: "created" and "skipped" user ID lists
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for user in users:
+            writer.writerow([user["user_id"], user["name"], user["password"], user["language"]])
+        buffer.seek(0)
+
+        with self._get_connection() as (conn, cursor):
+            cursor.execute("""
+                CREATE TEMP TABLE users_staging (
+                    user_id VARCHAR(255),
+                    name VARCHAR(255),
+                    password VARCHAR(255),
+                    language VARCHAR(255)
+                ) ON COMMIT DROP
+            """)
+            cursor.copy_expert("COPY users_staging FROM STDIN WITH (FORMAT csv)", buffer)
+            cursor.execute("""
+                WITH first_prompt AS (
+                    SELECT prompt_id, level, stage FROM promptID ORDER BY prompt_id LIMIT 1
+                )
+                INSERT INTO users (user_id, name, password, language, current_level, current_stage, progress_id)
+                SELECT s.user_id, s.name, s.password, s.language, f.stage, f.level, f.prompt_id
+                FROM users_staging s
+                LEFT JOIN first_prompt f ON TRUE
+                WHERE NOT EXISTS (SELECT 1 FROM users u WHERE u.name = s.name)
+                ON CONFLICT (user_id) DO NOTHING
+                RETURNING user_id
+            """)
+            created = {row[0] for row in cursor.fetchall()}
+            conn.commit()
+
+        return {
+            "created": [user["user_id"] for user in users if user["user_id"] in created],
+            "skipped": [user["user_id"] for user in users if user["user_id"] not in created],
+        }
+
     def check_user(self, name: str, password: str) -> bool:
         """
         Check if user exists in the database with given credentials.
@@ -144,7 +509,7 @@ class UserProgressDB:
             bool: True if user exists with matching credentials, False otherwise
         """
         try:
-            with self._get_connection() as (conn, cursor):
+            with self._get_connection(read_only=True) as (conn, cursor):
                 cursor.execute(
                     "SELECT user_id FROM users WHERE name = %s AND password = %s",
                     (name, password)
@@ -164,7 +529,7 @@ class UserProgressDB:
             Optional[str]: User ID if found, None otherwise
         """
         try:
-            with self._get_connection() as (conn, cursor):
+            with self._get_connection(read_only=True) as (conn, cursor):
                 cursor.execute("SELECT user_id FROM users WHERE name = %s", (name,))
                 result = cursor.fetchone()
                 return result[0] if result else None
@@ -184,7 +549,7 @@ class UserProgressDB:
             Optional[tuple]: (current_level, current_stage) or None if not found
         """
         try:
-            with self._get_connection(dict_cursor=True) as (conn, cursor):
+            with self._get_connection(dict_cursor=True, read_only=True, consistency_key=user_id) as (conn, cursor):
                 cursor.execute("SELECT current_level, current_stage, language FROM users WHERE user_id = %s", (user_id,))
                 result = cursor.fetchone()
                 return (result["current_level"], result["current_stage"], result["language"]) if result else None
@@ -194,7 +559,7 @@ class UserProgressDB:
 
     def update_user_level_and_stage(self, user_id: str, new_level: str, new_stage: str) -> bool:
             try:
-                with self._get_connection() as (conn, cursor):
+                with self._get_connection(consistency_key=user_id) as (conn, cursor):
                     cursor.execute(
                         "UPDATE users SET current_level = %s, current_stage = %s WHERE user_id = %s",
                         (new_level, new_stage, user_id)
@@ -216,7 +581,7 @@ class UserProgressDB:
             Dict[str, Any]: Progress ID or empty dict if not found
         """
         try:
-            with self._get_connection(dict_cursor=True) as (conn, cursor):
+            with self._get_connection(dict_cursor=True, read_only=True, consistency_key=user_id) as (conn, cursor):
                 cursor.execute("SELECT progress_id FROM users WHERE user_id = %s", (user_id,))
                 result = cursor.fetchone()
                 return result["progress_id"] if result else {}
@@ -235,7 +600,7 @@ class UserProgressDB:
             Optional[str]: User's preferred language, or None if not found
         """
         try:
-            with self._get_connection(dict_cursor=True) as (conn, cursor):
+            with self._get_connection(dict_cursor=True, read_only=True, consistency_key=user_id) as (conn, cursor):
                 cursor.execute("SELECT language FROM users WHERE user_id = %s", (user_id,))
                 result = cursor.fetchone()
                 return result["language"] if result else None
@@ -254,7 +619,7 @@ class UserProgressDB:
             Optional[tuple]: (current_level, current_stage) or None if not found
         """
         try:
-            with self._get_connection(dict_cursor=True) as (conn, cursor):
+            with self._get_connection(dict_cursor=True, read_only=True, consistency_key=user_id) as (conn, cursor):
                 cursor.execute(
                     "SELECT current_level, current_stage FROM users WHERE user_id = %s",
                     (user_id,)
@@ -266,23 +631,26 @@ class UserProgressDB:
             return None
 
     # User Update Methods
-    def update_user_progress(self, user_id: str, new_progress: int) -> bool:
+    def update_user_progress(self, user_id: str, new_progress: int, only_forward: bool = False) -> bool:
         """
         Update the progress ID for a user.
         
         Args:
             user_id: Unique identifier for the user
             new_progress: New progress ID value
+            only_forward: If True, keep the stored progress when it is
+                already further along
             
         Returns:
             bool: True if update successful, False otherwise
         """
         try:
-            with self._get_connection() as (conn, cursor):
-                cursor.execute(
-                    "UPDATE users SET progress_id = %s WHERE user_id = %s",
-                    (new_progress, user_id)
-                )
+            with self._get_connection(consistency_key=user_id) as (conn, cursor):
+                if only_forward:
+                    sql = "UPDATE users SET progress_id = GREATEST(progress_id, %s) WHERE user_id = %s"
+                else:
+                    sql = "UPDATE users SET progress_id = %s WHERE user_id = %s"
+                cursor.execute(sql, (new_progress, user_id))
                 conn.commit()
                 return True
         except Exception as e:
@@ -290,6 +658,38 @@ class UserProgressDB:
             return False
 
     # Prompt Data Retrieval Methods
+    def _get_prompt_row(self, prompt_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve a prompt row, served from the in-process curriculum cache.
+
+        Entries are evicted by the curriculum listener when the row changes.
+
+        Args:
+            prompt_id: Unique identifier for the prompt
+
+        Returns:
+            Optional[Dict[str, Any]]: prompt, notes_for_ai and
+            expected_user_response, or None if not found
+        """
+        row = prompt_rows.get(prompt_id)
+        if row is not None:
+            return row
+        try:
+            with self._get_connection(dict_cursor=True, read_only=True) as (conn, cursor):
+                cursor.execute(
+                    "SELECT prompt, notes_for_ai, expected_user_response FROM prompts WHERE prompt_id = %s",
+                    (prompt_id,)
+                )
+                result = cursor.fetchone()
+        except Exception as e:
+            print(f"Error retrieving prompt {prompt_id}: {e}")
+            return None
+        if result is None:
+            return None
+        row = dict(result)
+        prompt_rows.set(prompt_id, row)
+        return row
+
     def get_prompt(self, prompt_id: int) -> str:
         """
         Retrieve a prompt by its ID.
@@ -300,14 +700,8 @@ class UserProgressDB:
         Returns:
             str: Prompt text, or None if not found
         """
-        try:
-            with self._get_connection(dict_cursor=True) as (conn, cursor):
-                cursor.execute("SELECT prompt FROM prompts WHERE prompt_id = %s", (prompt_id,))
-                result = cursor.fetchone()
-                return result["prompt"] if result else None
-        except Exception as e:
-            print(f"Error retrieving lesson number: {e}")
-            return None
+        row = self._get_prompt_row(prompt_id)
+        return row["prompt"] if row else None
     
     def get_notes(self, prompt_id: int) -> str:
         """
@@ -319,17 +713,8 @@ class UserProgressDB:
         Returns:
             str: Notes for AI, or None if not found
         """
-        try:
-            with self._get_connection(dict_cursor=True) as (conn, cursor):
-                cursor.execute(
-                    "SELECT notes_for_ai FROM prompts WHERE prompt_id = %s",
-                    (prompt_id,)
-                )
-                result = cursor.fetchone()
-                return result["notes_for_ai"] if result else None
-        except Exception as e:
-            print(f"Error retrieving notes for AI: {e}")
-            return None
+        row = self._get_prompt_row(prompt_id)
+        return row["notes_for_ai"] if row else None
     
     def get_expected_response(self, prompt_id: int) -> str:
         """
@@ -341,18 +726,45 @@ class UserProgressDB:
         Returns:
             str: Expected user response, or None if not found
         """
+        row = self._get_prompt_row(prompt_id)
+        return row["expected_user_response"] if row else None
+    
+    def get_curriculum_edits(self) -> Dict[Optional[int], float]:
+        """
+        Retrieve when each prompt was last edited.
+
+        Returns:
+            Dict[Optional[int], float]: Epoch seconds of the last edit per
+            prompt_id; the None key holds the last change to every prompt
+            (TRUNCATE)
+        """
+        with self._get_connection() as (conn, cursor):
+            cursor.execute(
+                "SELECT prompt_id, EXTRACT(EPOCH FROM MAX(edited_at)) FROM curriculum_edits GROUP BY prompt_id"
+            )
+            return {prompt_id: float(edited_at) for prompt_id, edited_at in cursor.fetchall()}
+
+    def get_all_prompts(self) -> List[Dict[str, Any]]:
+        """
+        Retrieve every prompt with the fields needed to render its lesson.
+
+        Returns:
+            List[Dict[str, Any]]: prompt_id, prompt, expected_user_response,
+            level and stage for each prompt, ordered by prompt_id
+        """
         try:
-            with self._get_connection(dict_cursor=True) as (conn, cursor):
+            with self._get_connection(dict_cursor=True, read_only=True) as (conn, cursor):
                 cursor.execute(
-                    "SELECT expected_user_response FROM prompts WHERE prompt_id = %s",
-                    (prompt_id,)
+                    """
+                    SELECT prompt_id, prompt, expected_user_response, level, stage
+                    FROM prompts ORDER BY prompt_id
+                    """
                 )
-                result = cursor.fetchone()
-                return result["expected_user_response"] if result else None
+                return [dict(row) for row in cursor.fetchall()]
         except Exception as e:
-            print(f"Error retrieving expected response: {e}")
-            return None
-    
+            print(f"Error retrieving prompts: {e}")
+            return []
+
     def get_user_data(self, user_id: str) -> Optional[tuple]:
         language = self.get_user_language(user_id)
         stage = self.get_user_level_and_stage(user_id)[0]
@@ -372,7 +784,7 @@ class UserProgressDB:
             bool: True if update successful, False otherwise
         """
         try:
-            with self._get_connection() as (conn, cursor):
+            with self._get_connection(consistency_key=user_id) as (conn, cursor):
                 cursor.execute(
                     "UPDATE users SET current_level = %s, current_stage = %s WHERE user_id = %s",
                     (level, stage, user_id)
@@ -381,4 +793,255 @@ class UserProgressDB:
                 return True
         except Exception as e:
             print(f"Error updating user level and stage: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    # Attempt Recording and Aggregates
+    def record_attempt(self, user_id: str, prompt_id: int, score: float,
+                       feedback: str, completed: bool) -> bool:
+        """
+        Record a lesson attempt and fold it into the aggregate tables.
+
+        The raw row goes into `lessons` and the `user_stats` and
+        `user_prompt_stats` rows are upserted in the same statement, so
+        readers never need to scan the attempt history.
+
+        Args:
+            user_id: Unique identifier for the user
+            prompt_id: Prompt the attempt was made on
+            score: Evaluation score between 0.0 and 1.0
+            feedback: AI feedback shown to the learner
+            completed: Whether the attempt passed the threshold
+
+        Returns:
+            bool: True if recorded successfully, False otherwise
+        """
+        try:
+            with self._get_connection(consistency_key=user_id) as (conn, cursor):
+                cursor.execute(
+                    f"WITH {_RECORD_ATTEMPT_CTES} SELECT 1",
+                    self._attempt_params(user_id, prompt_id, score, feedback, completed)
+                )
+                conn.commit()
+                return True
+        except Exception as e:
+            print(f"Error recording attempt: {e}")
+            return False
+
+    @staticmethod
+    def _attempt_params(user_id: str, prompt_id: int, score: float,
+                        feedback: str, completed: bool) -> Dict[str, Any]:
+        now = datetime.now()
+        return {
+            "user_id": user_id,
+            "prompt_id": prompt_id,
+            "feedback": feedback,
+            "score": score,
+            "done": int(completed),
+            "now": now,
+            "completed_at": now if completed else None,
+        }
+
+    def advance_lesson(self, user_id: str, prompt_id: int, score: float,
+                       feedback: str) -> Optional[Dict[str, Any]]:
+        """
+        Record a completed attempt and move the user to the next prompt.
+
+        A single statement inserts the attempt, updates the aggregates, sets
+        `progress_id` to the next prompt in the `promptID` table and takes
+        the user's level and stage from that row, mapped the way create_user
+        populates them: `current_level` from `promptID.stage` and
+        `current_stage` from `promptID.level`. It runs in autocommit, so
+        the whole advance is one transaction and one round trip.
+
+        Args:
+            user_id: Unique identifier for the user
+            prompt_id: Prompt the user just completed
+            score: Evaluation score between 0.0 and 1.0
+            feedback: AI feedback shown to the learner
+
+        Returns:
+            Optional[Dict[str, Any]]: progress_id, current_level, current_stage,
+            language and curriculum_complete (True when there is no next
+            prompt), or None if the update failed
+        """
+        try:
+            with self._get_connection(dict_cursor=True, consistency_key=user_id) as (conn, cursor):
+                conn.autocommit = True
+                cursor.execute(
+                    f"""
+                    WITH next_prompt AS (
+                        SELECT prompt_id, level, stage FROM promptID
+                        WHERE prompt_id > %(prompt_id)s
+                        ORDER BY prompt_id
+                        LIMIT 1
+                    ),
+                    {_RECORD_ATTEMPT_CTES},
+                    advanced AS (
+                        UPDATE users SET
+                            progress_id = COALESCE((SELECT prompt_id FROM next_prompt), %(prompt_id)s),
+                            -- users keeps the promptID stage ("Beginner") as its level and the
+                            -- promptID level (L1-L4) as its stage; see create_user
+                            current_level = COALESCE((SELECT stage FROM next_prompt), current_level),
+                            current_stage = COALESCE((SELECT level FROM next_prompt), current_stage)
+                        WHERE user_id = %(user_id)s
+                        RETURNING progress_id, current_level, current_stage, language
+                    )
+                    SELECT advanced.*, NOT EXISTS (SELECT 1 FROM next_prompt) AS curriculum_complete
+                    FROM advanced
+                    """,
+                    self._attempt_params(user_id, prompt_id, score, feedback, True)
+                )
+                result = cursor.fetchone()
+                return dict(result) if result else None
+        except Exception as e:
+            print(f"Error advancing lesson: {e}")
+            return None
+
+    def get_user_stats(self, user_id: str) -> Dict[str, Any]:
+        """
+        Retrieve the aggregate progress of a user.
+
+        Args:
+            user_id: Unique identifier for the user
+
+        Returns:
+            Dict[str, Any]: attempts, completions (passing attempts),
+            completed_prompts (distinct prompts passed), mean_score,
+            best_score and timestamps, or empty dict if the user has no
+            attempts yet
+        """
+        try:
+            with self._get_connection(dict_cursor=True, read_only=True, consistency_key=user_id) as (conn, cursor):
+                cursor.execute(
+                    """
+                    SELECT attempts, completions, completed_prompts, best_score, first_attempt_at,
+                           last_attempt_at, last_completed_at,
+                           score_sum / NULLIF(attempts, 0) AS mean_score
+                    FROM user_stats WHERE user_id = %s
+                    """,
+                    (user_id,)
+                )
+                result = cursor.fetchone()
+                return dict(result) if result else {}
+        except Exception as e:
+            print(f"Error retrieving user stats: {e}")
+            return {}
+
+    def get_user_prompt_stats(self, user_id: str, prompt_id: int) -> Dict[str, Any]:
+        """
+        Retrieve the aggregate progress of a user on a single prompt.
+
+        Args:
+            user_id: Unique identifier for the user
+            prompt_id: Unique identifier for the prompt
+
+        Returns:
+            Dict[str, Any]: attempts, mean_score, best_score and timestamps,
+            or empty dict if the prompt has not been attempted
+        """
+        try:
+            with self._get_connection(dict_cursor=True, read_only=True, consistency_key=user_id) as (conn, cursor):
+                cursor.execute(
+                    """
+                    SELECT attempts, best_score, first_attempt_at, last_attempt_at, completed_at,
+                           score_sum / NULLIF(attempts, 0) AS mean_score
+                    FROM user_prompt_stats WHERE user_id = %s AND prompt_id = %s
+                    """,
+                    (user_id, prompt_id)
+                )
+                result = cursor.fetchone()
+                return dict(result) if result else {}
+        except Exception as e:
+            print(f"Error retrieving user prompt stats: {e}")
+            return {}
+
+    # UI Session Methods
+    def get_ui_session(self, session_id: str) -> Optional[bytes]:
+        """
+        Retrieve a saved UI session snapshot.
+
+        Always read from the primary, so the next worker sees a snapshot as
+        soon as it is written.
+
+        Args:
+            session_id: Session ID from the sid query parameter
+
+        Returns:
+            Optional[bytes]: Serialized snapshot, or None if missing or expired
+        """
+        with self._get_connection() as (conn, cursor):
+            cursor.execute(
+                "SELECT data FROM ui_sessions WHERE session_id = %s AND expires_at > NOW()",
+                (session_id,)
+            )
+            row = cursor.fetchone()
+        return bytes(row[0]) if row else None
+
+    def put_ui_session(self, session_id: str, data: bytes, ttl: int) -> None:
+        """
+        Save a UI session snapshot and drop expired ones.
+
+        Args:
+            session_id: Session ID from the sid query parameter
+            data: Serialized snapshot
+            ttl: Seconds until the snapshot expires
+        """
+        with self._get_connection() as (conn, cursor):
+            cursor.execute(
+                """
+                INSERT INTO ui_sessions (session_id, data, expires_at)
+                VALUES (%s, %s, NOW() + %s * INTERVAL '1 second')
+                ON CONFLICT (session_id) DO UPDATE SET data = EXCLUDED.data, expires_at = EXCLUDED.expires_at
+                """,
+                (session_id, psycopg2.Binary(data), ttl)
+            )
+            cursor.execute("DELETE FROM ui_sessions WHERE expires_at <= NOW()")
+            conn.commit()
+
+    def delete_ui_session(self, session_id: str) -> None:
+        """
+        Delete a UI session snapshot.
+
+        Args:
+            session_id: Session ID from the sid query parameter
+        """
+        with self._get_connection() as (conn, cursor):
+            cursor.execute("DELETE FROM ui_sessions WHERE session_id = %s", (session_id,))
+            conn.commit()
+
+    def rebuild_aggregates(self) -> bool:
+        """
+        Recompute `user_stats` and `user_prompt_stats` from the `lessons` history.
+
+        Returns:
+            bool: True if rebuild successful, False otherwise
+        """
+        try:
+            with self._get_connection() as (conn, cursor):
+                cursor.execute("TRUNCATE user_stats, user_prompt_stats")
+                cursor.execute("""
+                    INSERT INTO user_stats (user_id, attempts, completions, score_sum, best_score,
+                                            first_attempt_at, last_attempt_at, last_completed_at)
+                    SELECT user_id, COUNT(*), COUNT(completed_at), COALESCE(SUM(score), 0), MAX(score),
+                           MIN(COALESCE(attempted_at, completed_at)), MAX(COALESCE(attempted_at, completed_at)),
+                           MAX(completed_at)
+                    FROM lessons
+                    WHERE user_id IS NOT NULL
+                    GROUP BY user_id
+                """)
+                cursor.execute("""
+                    INSERT INTO user_prompt_stats (user_id, prompt_id, attempts, score_sum, best_score,
+                                                   first_attempt_at, last_attempt_at, completed_at)
+                    SELECT user_id, prompt_id::INTEGER, COUNT(*), COALESCE(SUM(score), 0), MAX(score),
+                           MIN(COALESCE(attempted_at, completed_at)), MAX(COALESCE(attempted_at, completed_at)),
+                           MIN(completed_at)
+                    FROM lessons
+                    WHERE user_id IS NOT NULL AND prompt_id ~ '^[0-9]+$'
+                    GROUP BY user_id, prompt_id::INTEGER
+                """)
+                cursor.execute(_FILL_COMPLETED_PROMPTS_SQL)
+                conn.commit()
+                return True
+        except Exception as e:
+            print(f"Error rebuilding aggregates: {e}")
+            return False
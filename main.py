@@ -1,31 +1,16 @@
-import os
 import streamlit as st
 from dotenv import load_dotenv
 
-from api.sarvam_api import SarvamAPI
 from components.auth.auth import Authentication
-from components.ai.prompt_templates import PromptTemplates
-from components.ai.chains import Chains
 from components.session.session import Session
-from components.ai.lesson_service import LessonService
-from utils.audio import Audio
+from utils.render_metrics import render_stats_table, timed
 from database.user_progress_db import UserProgressDB
+from database.curriculum_listener import start_curriculum_listener
 
 
 # Load environment variables
 load_dotenv()
 
-# Initialize components
-audio = Audio()
-chain = Chains()
-session = Session()
-lesson = LessonService()
-lesson_chain, evaluation_chain, tutor_chain = chain.init_apis_and_chains()
-prompt_templates = PromptTemplates()
-auth = Authentication()
-
-db = UserProgressDB()
-
 # Streamlit page config
 st.set_page_config(
     page_title="Language Learning Tutor",
@@ -33,47 +18,335 @@ st.set_page_config(
     layout="wide"
 )
 
+# Initialize components once per process; Streamlit re-executes this
+# module on every rerun. Only what the login page needs is built here.
+@st.cache_resource(show_spinner=False)
+def init_components():
+    db = UserProgressDB()
+    start_curriculum_listener(db)
+    return Session(), Authentication(), db
+
+
+# The LLM, Sarvam and audio stacks are imported on first use after login.
+@st.cache_resource(show_spinner=False)
+def get_lesson_components():
+    from components.ai.lesson_service import LessonService
+    from utils.audio import Audio
+
+    return Audio(), LessonService()
+
+
+def speech_gate_stats():
+    from utils.voice_activity import gate_stats
+
+    return gate_stats
+
+
+def audio_encoding_stats():
+    from utils.audio_encoding import encoding_stats_rows
+
+    return encoding_stats_rows()
+
+
+@st.cache_resource(show_spinner=False)
+def get_sarvam_api(language):
+    from api.sarvam_api import SarvamAPI
+
+    return SarvamAPI(language)
+
+
+session, auth, db = init_components()
+
+
+THRESHOLD = 0.6
+
+
+def get_user_context():
+    """Level, stage and language for the logged-in user, read once per lesson."""
+    if st.session_state.user_context is None:
+        st.session_state.user_context = db.get_user_level_stage_language(st.session_state.user_id)
+    return st.session_state.user_context
+
+
+def reset_lesson():
+    session.reset_lesson_state()
+    st.session_state.is_loading_lesson = False
+    st.session_state.is_processing_response = False
+
+
+@st.fragment
+@timed("sidebar")
+def render_sidebar(sarvam_api):
+    st.header(sarvam_api.t("📊 Progress"))
+    st.metric(sarvam_api.t("Current Lesson"), st.session_state.prompt_id)
+    st.metric(sarvam_api.t("Threshold Score"), f"{THRESHOLD:.1f}")
+
+    stats = db.get_user_stats(st.session_state.user_id)
+    if stats:
+        st.metric(sarvam_api.t("Attempts"), stats["attempts"])
+        st.metric(sarvam_api.t("Lessons Completed"), stats["completed_prompts"])
+        st.metric(sarvam_api.t("Average Score"), f"{stats['mean_score']:.2f}")
+
+    if st.button(sarvam_api.t("🔄 Reset Session"), use_container_width=True, key="reset_session"):
+        reset_lesson()
+        st.rerun()
+
+    with st.expander(sarvam_api.t("Render stats")):
+        st.dataframe(render_stats_table(), hide_index=True)
+        analysis = st.session_state.speech_analysis
+        if analysis is not None:
+            st.json(analysis._asdict())
+        st.json(dict(speech_gate_stats()))
+        # Token usage per prompt template version, for this worker
+        _, lesson = get_lesson_components()
+        st.dataframe(lesson.chain.usage.summary_rows(), hide_index=True)
+        # Audio size before and after Opus encoding, per clip, for this worker
+        st.dataframe(audio_encoding_stats(), hide_index=True)
+
+
+@st.fragment
+@timed("lesson")
+def render_lesson_area(sarvam_api, level, stage, language):
+    audio, lesson = get_lesson_components()
+
+    st.subheader(sarvam_api.t("📚 Lesson Area"))
+
+    # Use a placeholder to prevent flashing
+    lesson_area = st.empty()
+
+    # Show Start Lesson button
+    if not st.session_state.lesson_started and not st.session_state.is_loading_lesson:
+        with lesson_area.container():
+            if st.button(sarvam_api.t("▶️ Start Lesson"), type="primary", use_container_width=True, key="start_lesson"):
+                # Falls through to the loading branch below in this same run
+                st.session_state.is_loading_lesson = True
+
+    # Load lesson after button click
+    if st.session_state.is_loading_lesson and not st.session_state.lesson_started:
+        with lesson_area.container():
+            with st.spinner(sarvam_api.t("Preparing lesson...")):
+                try:
+                    lesson_text = lesson.start_lesson(
+                        st.session_state.prompt_id, level, stage, language
+                    )
+                    if lesson_text:
+                        st.session_state.current_lesson = lesson_text
+                        st.session_state.lesson_started = True
+                        st.session_state.is_loading_lesson = False
+                        # The recorder depends on lesson_started, so rerun the whole page
+                        st.rerun()
+                    else:
+                        st.error(sarvam_api.t("❌ Failed to load lesson. Please try again."))
+                        st.session_state.is_loading_lesson = False
+                except Exception as e:
+                    st.error(f"❌ {sarvam_api.t('Error loading lesson')}: {e}")
+                    st.session_state.is_loading_lesson = False
+                    import traceback
+                    st.text(traceback.format_exc())
+
+    # Display lesson content
+    elif st.session_state.current_lesson and st.session_state.lesson_started:
+        with lesson_area.container():
+            st.info(f"🎯 **{sarvam_api.t('Current Lesson')}:**")
+            st.write(st.session_state.current_lesson)
+
+            # Only show expected response audio if not showing feedback
+            if not st.session_state.show_feedback:
+                st.markdown("### " + sarvam_api.t("Expected Response Audio"))
+                try:
+                    audio.expected_response_audio(language)
+                except Exception as e:
+                    st.warning(f"⚠️ {sarvam_api.t('Could not load audio')}: {e}")
+
+
+@st.fragment
+@timed("lesson_audio")
+def render_lesson_audio(sarvam_api, language):
+    # Rendered after everything else: synthesizing a long lesson must not
+    # hold up the recorder or feedback.
+    if not (st.session_state.lesson_started and st.session_state.current_lesson):
+        return
+    audio, _ = get_lesson_components()
+
+    st.markdown("### " + sarvam_api.t("Lesson Audio"))
+    try:
+        audio.lesson_audio(st.session_state.current_lesson, language)
+    except Exception as e:
+        st.warning(f"⚠️ {sarvam_api.t('Could not load audio')}: {e}")
+
+
+@st.fragment
+@timed("recorder")
+def render_recorder(sarvam_api, level, stage, language):
+    audio, lesson = get_lesson_components()
+
+    st.subheader(sarvam_api.t("🎤 Audio Recording"))
+
+    # Create a stable placeholder to prevent ghosting
+    audio_placeholder = st.empty()
+    status_placeholder = st.empty()
+
+    # Only show audio recorder if lesson has started and not processing/showing feedback
+    if (st.session_state.lesson_started
+        and not st.session_state.is_processing_response
+        and not st.session_state.show_feedback):
+
+        with audio_placeholder:
+            audio_result = audio.save_audio()
+
+        # Show status after recording attempt
+        analysis = st.session_state.speech_analysis
+        if audio_result and analysis is not None and not analysis.usable:
+            st.session_state.audio_saved = False
+            with status_placeholder:
+                st.warning(f"⚠️ {sarvam_api.t(analysis.reason)}")
+        elif audio_result:
+            st.session_state.audio_saved = True
+            with status_placeholder:
+                st.success(sarvam_api.t("✅ Audio saved!"))
+        else:
+            st.session_state.audio_saved = False
+            with status_placeholder:
+                st.warning(sarvam_api.t("⚠️ No audio recorded"))
+
+    # Show "Recording complete" ONLY during processing or feedback
+    elif (st.session_state.audio_saved
+        and (st.session_state.is_processing_response or st.session_state.show_feedback)):
+        # Clear the audio placeholder
+        audio_placeholder.empty()
+        with status_placeholder:
+            st.info(sarvam_api.t("🎤 Recording complete"))
+
+    if (
+        st.session_state.lesson_started
+        and st.session_state.audio_saved
+        and not st.session_state.show_feedback
+    ):
+        st.divider()
+        st.subheader(sarvam_api.t("📝 Submit Your Response"))
+
+        # Process response button - only show when NOT processing
+        button_placeholder = st.empty()
+        if not st.session_state.is_processing_response:
+            if button_placeholder.button(
+                sarvam_api.t("🚀 Process My Response"),
+                type="primary",
+                use_container_width=True,
+                key="process_response_btn"
+            ):
+                # Hide the button and recorder and process in this same run
+                st.session_state.is_processing_response = True
+                button_placeholder.empty()
+                audio_placeholder.empty()
+                status_placeholder.info(sarvam_api.t("🎤 Recording complete"))
 
+        # Show spinner when processing (button will be hidden)
+        if st.session_state.is_processing_response:
+            with st.spinner(sarvam_api.t("Processing your response...")):
+                try:
+                    feedback_data = lesson.process_response(
+                        st.session_state.prompt_id, level, stage, language, THRESHOLD,
+                        recording_id=st.session_state.recording_id,
+                        audio_bytes=st.session_state.recording_bytes,
+                    )
+                    # A passed lesson is persisted and advanced right away, so
+                    # progress survives a dropped session.
+                    if feedback_data['lesson_complete']:
+                        feedback_data['next_state'] = db.advance_lesson(
+                            st.session_state.user_id,
+                            st.session_state.prompt_id,
+                            feedback_data['score'],
+                            feedback_data['feedback'],
+                        )
+                        if feedback_data['next_state']:
+                            # The next prompt is saved; nothing may write the old one back
+                            st.session_state.prompt_id = feedback_data['next_state']['progress_id']
+                    elif feedback_data['graded']:
+                        db.record_attempt(
+                            st.session_state.user_id,
+                            st.session_state.prompt_id,
+                            feedback_data['score'],
+                            feedback_data['feedback'],
+                            False,
+                        )
+                    st.session_state.feedback_data = feedback_data
+                    st.session_state.show_feedback = True
+                    st.session_state.is_processing_response = False
+                    # Feedback, lesson area and sidebar all change, so rerun the whole page
+                    st.rerun()
+                except Exception as e:
+                    st.session_state.is_processing_response = False
+                    st.error(f"❌ {sarvam_api.t('Error during response processing')}: {e}")
+                    import traceback
+                    st.text(traceback.format_exc())
+
+
+@st.fragment
+@timed("feedback")
+def render_feedback(sarvam_api):
+    if not (st.session_state.show_feedback and st.session_state.feedback_data):
+        return
+
+    st.divider()
+    feedback_data = st.session_state.feedback_data
+
+    st.write(f"**{sarvam_api.t('You said')}:**", feedback_data['user_input'])
+    st.write(f"**{sarvam_api.t('Feedback')}:**", feedback_data['feedback'])
+    st.metric(sarvam_api.t("Score"), f"{feedback_data['score']:.2f}")
+
+    if feedback_data['lesson_complete']:
+        st.success(sarvam_api.t("🎉 Lesson Complete! Moving to next lesson..."))
+        st.balloons()
+
+        next_state = feedback_data.get('next_state')
+        if next_state and next_state['curriculum_complete']:
+            st.success(sarvam_api.t("🏆 You have completed every lesson in the course!"))
+
+        if st.button(sarvam_api.t("➡️ Continue to Next Lesson"), type="primary", use_container_width=True, key="continue_lesson"):
+            if next_state:
+                # Progress and prompt_id were already moved on by advance_lesson
+                st.session_state.user_context = (
+                    next_state['current_level'], next_state['current_stage'], next_state['language']
+                )
+            else:
+                st.session_state.prompt_id += 1
+                db.update_user_progress(st.session_state.user_id, st.session_state.prompt_id)
+                st.session_state.user_context = None
+            reset_lesson()
+            st.rerun()
+    else:
+        st.warning(sarvam_api.t("📖 Let's try that lesson again!"))
+        if st.button(sarvam_api.t("🔄 Try Again"), use_container_width=True, key="try_again"):
+            # Reset only the necessary states for retry
+            st.session_state.audio_saved = False
+            st.session_state.recording_id = None
+            st.session_state.recording_bytes = None
+            st.session_state.speech_analysis = None
+            st.session_state.show_feedback = False
+            st.session_state.feedback_data = {}
+            st.session_state.is_processing_response = False
+            st.rerun()
+
+
+@timed("app")
 def main():
     session.init_session_state()
-    
-    # Hide running indicator and prevent component fading
-    # st.markdown("""
-    #     <style>
-    #     /* Hide running indicator */
-    #     [data-testid="stStatusWidget"] {
-    #         display: none !important;
-    #     }
-        
-    #     /* Prevent component fading during reruns */
-    #     .stApp [data-testid="stVerticalBlock"] > div {
-    #         transition: none !important;
-    #     }
-        
-    #     .stApp section[data-testid="stSidebar"] > div {
-    #         transition: none !important;
-    #     }
-        
-    #     /* Remove opacity changes during reruns */
-    #     .stApp * {
-    #         transition: opacity 0s !important;
-    #     }
-        
-    #     /* Force full opacity at all times */
-    #     .element-container {
-    #         opacity: 1 !important;
-    #     }
-    #     </style>
-    # """, unsafe_allow_html=True)
+    if st.session_state.authenticated and st.session_state.session_owner != st.session_state.user_id:
+        session.login()
+    try:
+        render_page()
+    finally:
+        # Also runs when a section calls st.rerun()
+        session.persist()
 
+
+def render_page():
     if not st.session_state.authenticated:
         auth.authentication_form()
         return
 
-    level, stage, language = db.get_user_level_stage_language(st.session_state.user_id)
-    threshold = 0.6  
-    sarvam_api = SarvamAPI(language)
-    
+    level, stage, language = get_user_context()
+    sarvam_api = get_sarvam_api(language)
 
     # Add loading states to session
     if 'is_loading_lesson' not in st.session_state:
@@ -92,7 +365,6 @@ def main():
                 st.toast(sarvam_api.t("🎉 Congratulations! You've completed all lessons in this stage. Advancing to the next stage."))
                 st.session_state.last_toast_prompt = st.session_state.prompt_id
 
-    
     # Page header
     st.title("🎓 LangOdyssey")
     st.markdown(f"**{sarvam_api.t('Level')}:** {level} | **{sarvam_api.t('Stage')}:** {stage} | **{sarvam_api.t('Language')}:** {language}")
@@ -102,193 +374,35 @@ def main():
     
     st.divider()
 
-    # Sidebar
     with st.sidebar:
-        st.header(sarvam_api.t("📊 Progress"))
-        st.metric(sarvam_api.t("Current Lesson"), st.session_state.prompt_id)
-        st.metric(sarvam_api.t("Threshold Score"), f"{threshold:.1f}")
-
-        if st.button(sarvam_api.t("🔄 Reset Session"), use_container_width=True, key="reset_session"):
-            session.reset_lesson_state()
-            st.session_state.is_loading_lesson = False
-            st.session_state.is_processing_response = False
-            st.rerun()
+        render_sidebar(sarvam_api)
 
-    # Layout
     col1, col2 = st.columns([2, 1])
-
     with col1:
-        st.subheader(sarvam_api.t("📚 Lesson Area"))
-        
-        # Use a placeholder to prevent flashing
-        lesson_area = st.empty()
-
-        # Show Start Lesson button
-        if not st.session_state.lesson_started and not st.session_state.is_loading_lesson:
-            with lesson_area.container():
-                if st.button(sarvam_api.t("▶️ Start Lesson"), type="primary", use_container_width=True, key="start_lesson"):
-                    st.session_state.is_loading_lesson = True
-                    st.rerun()
-        
-        # Load lesson after button click
-        if st.session_state.is_loading_lesson and not st.session_state.lesson_started:
-            with lesson_area.container():
-                with st.spinner(sarvam_api.t("Preparing lesson...")):
-                    try:
-                        lesson_text = lesson.start_lesson(
-                            st.session_state.prompt_id, level, stage, language
-                        )
-                        if lesson_text:
-                            st.session_state.current_lesson = lesson_text
-                            st.session_state.lesson_started = True
-                            st.session_state.is_loading_lesson = False
-                            st.rerun()
-                        else:
-                            st.error(sarvam_api.t("❌ Failed to load lesson. Please try again."))
-                            st.session_state.is_loading_lesson = False
-                    except Exception as e:
-                        st.error(f"❌ {sarvam_api.t('Error loading lesson')}: {e}")
-                        st.session_state.is_loading_lesson = False
-                        import traceback
-                        st.text(traceback.format_exc())
-        
-        # Display lesson content
-        elif st.session_state.current_lesson and st.session_state.lesson_started:
-            with lesson_area.container():
-                st.info(f"🎯 **{sarvam_api.t('Current Lesson')}:**")
-                st.write(st.session_state.current_lesson)
-                
-                # Only show expected response audio if not showing feedback
-                if not st.session_state.show_feedback:
-                    st.markdown("### " + sarvam_api.t("Expected Response Audio"))
-                    try:
-                        audio.expected_response_audio()
-                    except Exception as e:
-                        st.warning(f"⚠️ {sarvam_api.t('Could not load audio')}: {e}")
-
+        render_lesson_area(sarvam_api, level, stage, language)
+        lesson_audio_area = st.container()
     with col2:
-        st.subheader(sarvam_api.t("🎤 Audio Recording"))
-    
-    # Create a stable placeholder to prevent ghosting
-        audio_placeholder = st.empty()
-        status_placeholder = st.empty()
-    
-    # Only show audio recorder if lesson has started and not processing/showing feedback
-        if (st.session_state.lesson_started 
-            and not st.session_state.is_processing_response 
-            and not st.session_state.show_feedback):
-        
-            with audio_placeholder:
-                audio_result = audio.save_audio()
-        
-        # Show status after recording attempt
-            if audio_result:
-                st.session_state.audio_saved = True
-                with status_placeholder:
-                    st.success(sarvam_api.t("✅ Audio saved!"))
-            elif st.session_state.lesson_started:  # Only show warning if lesson is active
-                st.session_state.audio_saved = False
-                with status_placeholder:
-                    st.warning(sarvam_api.t("⚠️ No audio recorded"))
-    
-    # Show "Recording complete" ONLY during processing or feedback
-        elif (st.session_state.audio_saved 
-            and (st.session_state.is_processing_response or st.session_state.show_feedback)):
-        # Clear the audio placeholder
-            audio_placeholder.empty()
-            with status_placeholder:
-                st.info(sarvam_api.t("🎤 Recording complete"))
-
-    # Process response button - only show when NOT processing
-    # Show button only when not processing
-    if (
-        st.session_state.lesson_started
-        and st.session_state.audio_saved
-        and not st.session_state.show_feedback
-        and not st.session_state.is_processing_response
-    ):
-        st.divider()
-        st.subheader(sarvam_api.t("📝 Submit Your Response"))
-
-        if st.button(
-            sarvam_api.t("🚀 Process My Response"), 
-            type="primary", 
-            use_container_width=True, 
-            key="process_response_btn"
-        ):
-            # Set flag and rerun to hide button and show spinner
-            st.session_state.is_processing_response = True
-            st.rerun()
+        render_recorder(sarvam_api, level, stage, language)
 
-# Show spinner when processing (button will be hidden)
-    elif (
-        st.session_state.lesson_started
-        and st.session_state.audio_saved
-        and not st.session_state.show_feedback
-        and st.session_state.is_processing_response
-    ):
-        st.divider()
-        st.subheader(sarvam_api.t("📝 Submit Your Response"))
-    
-        with st.spinner(sarvam_api.t("Processing your response...")):
-            try:
-                feedback_data = lesson.process_response(
-                st.session_state.prompt_id, level, stage, language, threshold
-                )
-                st.session_state.feedback_data = feedback_data
-                st.session_state.show_feedback = True
-                st.session_state.is_processing_response = False
-                st.rerun()
-            except Exception as e:
-                st.session_state.is_processing_response = False
-                st.error(f"❌ {sarvam_api.t('Error during response processing')}: {e}")
-                import traceback
-                st.text(traceback.format_exc())
-
-    # Feedback display
-    if st.session_state.show_feedback and st.session_state.feedback_data:
-        st.divider()
-        feedback_data = st.session_state.feedback_data
-
-        st.write(f"**{sarvam_api.t('You said')}:**", feedback_data['user_input'])
-        st.write(f"**{sarvam_api.t('Feedback')}:**", feedback_data['feedback'])
-        st.metric(sarvam_api.t("Score"), f"{feedback_data['score']:.2f}")
-
-        if feedback_data['lesson_complete']:
-            st.success(sarvam_api.t("🎉 Lesson Complete! Moving to next lesson..."))
-            st.balloons()
-
-            if st.button(sarvam_api.t("➡️ Continue to Next Lesson"), type="primary", use_container_width=True, key="continue_lesson"):
-                # Update progress and move to next lesson
-                st.session_state.prompt_id += 1
-                db.update_user_level_and_stage(st.session_state.user_id, level, stage)
-                session.reset_lesson_state()
-                st.session_state.is_loading_lesson = False
-                st.session_state.is_processing_response = False
-                st.rerun()
-        else:
-            st.warning(sarvam_api.t("📖 Let's try that lesson again!"))
-            if st.button(sarvam_api.t("🔄 Try Again"), use_container_width=True, key="try_again"):
-                # Reset only the necessary states for retry
-                st.session_state.audio_saved = False
-                st.session_state.show_feedback = False
-                st.session_state.feedback_data = {}
-                st.session_state.is_processing_response = False
-                st.rerun()
+    render_feedback(sarvam_api)
 
     # Exit button
     if st.button(sarvam_api.t("🚪 Exit Learning"), type="primary", key="exit_learning"):
-        db.update_user_progress(st.session_state.user_id, st.session_state.prompt_id)
-        session.reset_lesson_state()
+        # Never moves progress backwards, e.g. from a tab left on an older lesson
+        db.update_user_progress(st.session_state.user_id, st.session_state.prompt_id, only_forward=True)
+        reset_lesson()
         st.session_state.authenticated = False
-        st.session_state.is_loading_lesson = False
-        st.session_state.is_processing_response = False
+        st.session_state.user_context = None
+        session.logout()
         st.success(sarvam_api.t("You have exited the learning session. 👋"))
         st.rerun()
 
     st.divider()
     st.caption(sarvam_api.t("💡 Click 'Start Lesson' → Record your response → Save audio → Process response"))
 
+    with lesson_audio_area:
+        render_lesson_audio(sarvam_api, language)
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
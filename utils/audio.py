@@ -1,6 +1,21 @@
 import streamlit as st
 from database.user_progress_db import UserProgressDB    
-from api.sarvam_api import SarvamAPI
+from api.sarvam_api import SarvamAPI, stitch_wav
+from api.resilience import NegativeCache
+from utils.audio_encoding import encode_audio
+from utils.curriculum_bundle import load_bundle
+from utils.curriculum_cache import CurriculumCache
+from utils.speculative_stt import recording_id, transcriber
+from utils.voice_activity import analyze_speech
+
+
+# Encoded expected-response audio per prompt, keyed by the response text.
+expected_audio = CurriculumCache("expected_audio")
+
+# Prompts whose audio failed recently; the page skips audio for them
+# instead of waiting on TTS again on every rerun.
+failed_audio = NegativeCache()
+
 
 class Audio:
     def __init__(self):
@@ -9,12 +24,72 @@ class Audio:
     def save_audio(self):
         audio_value = st.audio_input("Record your response", sample_rate=44100,width="stretch", key = f"audio_{st.session_state.prompt_id}")
         if audio_value is not None:
-            with open("temp.wav", "wb") as f:
-                f.write(audio_value.getbuffer())
-                return True
+            audio_bytes = audio_value.getvalue()
+
+            # Check for speech and start transcribing a new recording right
+            # away; recordings without usable speech never reach STT.
+            rec_id = recording_id(audio_bytes)
+            if rec_id != st.session_state.recording_id:
+                transcriber.discard(st.session_state.recording_id)
+                st.session_state.recording_id = rec_id
+                st.session_state.recording_bytes = audio_bytes
+                st.session_state.speech_analysis = analyze_speech(audio_bytes)
+                if st.session_state.speech_analysis.usable:
+                    transcriber.submit(rec_id, audio_bytes)
+            return True
+
+        transcriber.discard(st.session_state.recording_id)
+        st.session_state.recording_id = None
+        st.session_state.recording_bytes = None
+        st.session_state.speech_analysis = None
         return False
 
-    def expected_response_audio(self):
-        expected_response = self.db.get_expected_response(st.session_state.prompt_id)
-        audio_bytes = self.sarvam_api.text_to_speech(expected_response)
-        st.audio(audio_bytes, format="audio/wav")
\ No newline at end of file
+    def expected_response_audio(self, language=None):
+        bundle = load_bundle(language)
+        if bundle is not None:
+            audio_bytes = bundle.audio(st.session_state.prompt_id)
+            if audio_bytes:
+                st.audio(audio_bytes, format=bundle.audio_mime(st.session_state.prompt_id))
+                return
+        prompt_id = st.session_state.prompt_id
+        if prompt_id in failed_audio:
+            return
+        expected_response = self.db.get_expected_response(prompt_id)
+        encoded = expected_audio.get(prompt_id, expected_response)
+        if encoded is None:
+            audio_bytes = self.sarvam_api.text_to_speech(expected_response)
+            if not audio_bytes:
+                failed_audio.add(prompt_id)
+                return
+            encoded = encode_audio(audio_bytes, label=f"expected/{prompt_id}")
+            expected_audio.set(prompt_id, encoded, expected_response)
+        st.audio(encoded.data, format=encoded.mime)
+
+    def lesson_audio(self, lesson_text, language):
+        if st.session_state.lesson_audio:
+            encoded = st.session_state.lesson_audio
+            st.audio(encoded.data, format=encoded.mime)
+            return
+        failure_key = ("lesson", st.session_state.prompt_id, language)
+        if failure_key in failed_audio:
+            return
+
+        # Play the first chunk while the rest are still being synthesized,
+        # then swap in the stitched lesson audio. It starts from the top:
+        # whether the first chunk is actually playing (autoplay may be
+        # blocked, or the learner paused) can't be known here.
+        sarvam_api = SarvamAPI(language)
+        player = st.empty()
+        segments = []
+        for segment in sarvam_api.iter_long_text_to_speech(lesson_text):
+            if not segments:
+                player.audio(segment, format="audio/wav", autoplay=True)
+            segments.append(segment)
+        if not segments:
+            failed_audio.add(failure_key)
+            return
+
+        encoded = encode_audio(stitch_wav(segments), label=f"lesson/{st.session_state.prompt_id}")
+        st.session_state.lesson_audio = encoded
+        if len(segments) > 1:
+            player.audio(encoded.data, format=encoded.mime, autoplay=True)
@@ -0,0 +1,74 @@
+import io
+import threading
+from typing import Any, Dict, List, NamedTuple
+
+OPUS_BITRATE = 24000
+OPUS_SAMPLE_RATE = 48000
+
+
+class EncodedAudio(NamedTuple):
+    data: bytes
+    mime: str
+    wav_size: int
+
+
+# Byte sizes per label (e.g. "expected/12", "lesson/12") for the current process.
+encoding_stats: Dict[str, Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+def wav_to_opus(wav_bytes: bytes, bitrate: int = OPUS_BITRATE) -> bytes:
+    """Transcode WAV bytes to mono Opus in an Ogg container."""
+    import av  # FFmpeg bindings are heavy; only load them once audio is encoded
+
+    output = io.BytesIO()
+    with av.open(io.BytesIO(wav_bytes)) as source, av.open(output, "w", format="ogg") as target:
+        stream = target.add_stream("libopus", rate=OPUS_SAMPLE_RATE, layout="mono")
+        stream.bit_rate = bitrate
+        for frame in source.decode(audio=0):
+            frame.pts = None
+            for packet in stream.encode(frame):
+                target.mux(packet)
+        for packet in stream.encode(None):
+            target.mux(packet)
+    return output.getvalue()
+
+
+def encode_audio(wav_bytes: bytes, label: str = "") -> EncodedAudio:
+    """
+    Compress TTS output for delivery, falling back to the original WAV.
+
+    Args:
+        wav_bytes: WAV audio as returned by SarvamAPI
+        label: Name the byte-size metrics are recorded under
+
+    Returns:
+        EncodedAudio with the bytes to serve and their MIME type
+    """
+    import av
+
+    try:
+        encoded = EncodedAudio(wav_to_opus(wav_bytes), "audio/ogg", len(wav_bytes))
+    except (av.FFmpegError, ValueError) as e:
+        print(f"Error encoding audio, serving WAV: {e}")
+        encoded = EncodedAudio(wav_bytes, "audio/wav", len(wav_bytes))
+
+    if label:
+        with _stats_lock:
+            encoding_stats[label] = {"wav_bytes": encoded.wav_size, "encoded_bytes": len(encoded.data)}
+    return encoded
+
+
+def encoding_stats_rows() -> List[Dict[str, Any]]:
+    """Rows of per-clip byte sizes and reduction suitable for st.dataframe."""
+    with _stats_lock:
+        stats = dict(encoding_stats)
+    return [
+        {
+            "clip": label,
+            "wav_bytes": sizes["wav_bytes"],
+            "encoded_bytes": sizes["encoded_bytes"],
+            "reduction_pct": round(100 * (1 - sizes["encoded_bytes"] / sizes["wav_bytes"]), 1) if sizes["wav_bytes"] else 0.0,
+        }
+        for label, sizes in sorted(stats.items())
+    ]
@@ -0,0 +1,97 @@
+"""Render the curriculum for one or more languages into mmap-able bundle files.
+
+Each bundle holds, for every prompt, the generated lesson text and the
+expected-response TTS audio, plus translations of every UI string passed to
+``sarvam_api.t`` in main.py.
+
+Usage:
+    python -m utils.build_bundle hi ta --output-dir bundles
+"""
+import argparse
+import ast
+import os
+from datetime import datetime, timezone
+
+from api.sarvam_api import SarvamAPI
+from components.ai.lesson_service import LessonService
+from components.ai.prompt_templates import LESSON_TEMPLATE_ID
+from utils.audio_encoding import encode_audio
+from utils.curriculum_bundle import (
+    BUNDLE_DIR, audio_key, bundle_path, lesson_key, ui_key, write_bundle,
+)
+from utils.voice_activity import REJECTION_REASONS
+
+MAIN_MODULE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+
+def collect_ui_strings(path: str = MAIN_MODULE):
+    """Find the string literals passed to ``<anything>.t(...)`` in a module."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    strings = []
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Attribute)
+                and node.func.attr == "t"
+                and node.args
+                and isinstance(node.args[0], ast.Constant)
+                and isinstance(node.args[0].value, str)):
+            strings.append(node.args[0].value)
+    return list(dict.fromkeys(strings))
+
+
+def build_language(language: str, output_dir: str, lesson_service: LessonService) -> str:
+    sarvam_api = SarvamAPI(language)
+    entries = {}
+    audio_cache = {}
+    audio_formats = {}
+
+    for row in lesson_service.db.get_all_prompts():
+        prompt_id = row["prompt_id"]
+        # Same inputs as the live path: users.current_level holds the prompt's
+        # stage and users.current_stage its level (see UserProgressDB.create_user)
+        lesson = lesson_service.generate_lesson(prompt_id, row["stage"], row["level"], language)
+        if lesson:
+            entries[lesson_key(prompt_id)] = lesson.encode("utf-8")
+
+        expected = row["expected_user_response"]
+        if expected not in audio_cache:
+            wav = sarvam_api.text_to_speech(expected)
+            audio_cache[expected] = (
+                encode_audio(wav, label=f"expected/{prompt_id}")
+                if wav else None
+            )
+        encoded = audio_cache[expected]
+        if encoded is not None:
+            entries[audio_key(prompt_id)] = encoded.data
+            audio_formats[audio_key(prompt_id)] = encoded.mime
+
+    for text in collect_ui_strings() + list(REJECTION_REASONS.values()):
+        translated = sarvam_api.translate_text(text, target_language=language)
+        if translated:
+            entries[ui_key(text)] = translated.encode("utf-8")
+
+    path = bundle_path(language, output_dir)
+    write_bundle(path, entries, {
+        "language": language,
+        "lesson_template_id": LESSON_TEMPLATE_ID,
+        "audio_formats": audio_formats,
+        "built_at": datetime.now(timezone.utc).isoformat(),
+    })
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("languages", nargs="+", help="Language codes, e.g. hi ta bn")
+    parser.add_argument("--output-dir", default=BUNDLE_DIR)
+    args = parser.parse_args()
+
+    lesson_service = LessonService()
+    for language in args.languages:
+        path = build_language(language, args.output_dir, lesson_service)
+        print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Compare the single-call and two-call grading paths on a fixed set of transcripts.
+
+Each row of the samples file is graded with both modes; the report shows
+per-mode latency, how often the two agree on the score and on whether
+the lesson is complete, and token usage per prompt template.
+
+Usage:
+    python -m utils.compare_grading
+    python -m utils.compare_grading --samples database/grading_samples.csv --threshold 0.6
+"""
+import argparse
+import csv
+import math
+import os
+import statistics
+import time
+
+from components.ai.lesson_service import GRADING_COMBINED, GRADING_TWO_CALL, LessonService
+
+DEFAULT_SAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                               "database", "grading_samples.csv")
+MODES = (GRADING_TWO_CALL, GRADING_COMBINED)
+
+
+def grade_samples(lesson_service, samples, threshold):
+    """Grade every sample with both modes, returning one result dict per sample."""
+    results = []
+    for sample in samples:
+        row = {"prompt_id": sample["prompt_id"], "transcript": sample["transcript"]}
+        for mode in MODES:
+            start = time.perf_counter()
+            graded = lesson_service.grade_response(
+                int(sample["prompt_id"]), sample["level"], sample["stage"], sample["language"],
+                threshold, sample["transcript"], mode=mode,
+            )
+            row[mode] = {**graded, "latency_s": time.perf_counter() - start}
+        results.append(row)
+    return results
+
+
+def summarize(results):
+    summary = {}
+    for mode in MODES:
+        latencies = [row[mode]["latency_s"] for row in results]
+        summary[mode] = {
+            "mean_latency_s": statistics.mean(latencies),
+            "p95_latency_s": sorted(latencies)[math.ceil(len(latencies) * 0.95) - 1],
+        }
+    summary["score_mean_abs_diff"] = statistics.mean(
+        abs(row[GRADING_TWO_CALL]["score"] - row[GRADING_COMBINED]["score"]) for row in results
+    )
+    summary["completion_agreement"] = statistics.mean(
+        row[GRADING_TWO_CALL]["lesson_complete"] == row[GRADING_COMBINED]["lesson_complete"] for row in results
+    )
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", default=DEFAULT_SAMPLES, help="CSV with prompt_id, level, stage, language, transcript")
+    parser.add_argument("--threshold", type=float, default=0.6)
+    args = parser.parse_args()
+
+    with open(args.samples, newline="", encoding="utf-8") as f:
+        samples = list(csv.DictReader(f))
+
+    lesson_service = LessonService()
+    results = grade_samples(lesson_service, samples, args.threshold)
+    for row in results:
+        scores = "  ".join(
+            f"{mode}={row[mode]['score']:.2f}{'*' if row[mode]['lesson_complete'] else ''} ({row[mode]['latency_s']:.1f}s)"
+            for mode in MODES
+        )
+        print(f"prompt {row['prompt_id']:>3} | {row['transcript'][:40]:<40} | {scores}")
+
+    summary = summarize(results)
+    print()
+    for mode in MODES:
+        print(f"{mode}: mean {summary[mode]['mean_latency_s']:.2f}s, p95 {summary[mode]['p95_latency_s']:.2f}s")
+    print(f"mean |score difference|: {summary['score_mean_abs_diff']:.3f}")
+    print(f"completion agreement: {summary['completion_agreement']:.0%}")
+
+    print()
+    for row in lesson_service.chain.usage.summary_rows():
+        print(
+            f"{row['template_id']}: {row['calls']} calls, "
+            f"{row['prompt_tokens']} prompt / {row['completion_tokens']} completion tokens, "
+            f"cache hit {row['cache_hit_ratio']:.0%}, mean {row['mean_latency_s']:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
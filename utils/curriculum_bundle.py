@@ -0,0 +1,129 @@
+import json
+import mmap
+import os
+import struct
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from utils.curriculum_cache import edited_since
+
+# File layout:
+#   MAGIC (4 bytes) | format version (u32) | index length (u32) | index JSON | blobs
+# The index maps entry keys to (offset, length) pairs relative to the start
+# of the blob section.
+MAGIC = b"LODB"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sII")
+
+BUNDLE_DIR = os.getenv("CURRICULUM_BUNDLE_DIR", "bundles")
+
+
+def lesson_key(prompt_id) -> str:
+    return f"lesson/{int(prompt_id)}"
+
+
+def audio_key(prompt_id) -> str:
+    return f"audio/{int(prompt_id)}"
+
+
+def ui_key(text: str) -> str:
+    return f"ui/{text}"
+
+
+def bundle_path(language: str, bundle_dir: Optional[str] = None) -> str:
+    return os.path.join(bundle_dir or BUNDLE_DIR, f"{language}.bundle")
+
+
+class CurriculumBundle:
+    """Read-only, memory-mapped view of a prebuilt curriculum bundle.
+
+    The file is mapped with ACCESS_READ so every worker process on a host
+    shares the same page-cache pages.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, index_length = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a curriculum bundle")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has bundle format {version}, expected {FORMAT_VERSION}")
+
+        index_start = _HEADER.size
+        index = json.loads(self._mmap[index_start:index_start + index_length])
+        self.metadata = index["metadata"]
+        # Bundles without a build time are treated as older than any edit
+        built_at = self.metadata.get("built_at")
+        self.built_at = datetime.fromisoformat(built_at).timestamp() if built_at else 0.0
+        self._entries: Dict[str, Tuple[int, int]] = index["entries"]
+        self._data_start = index_start + index_length
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        offset, length = entry
+        start = self._data_start + offset
+        return self._mmap[start:start + length]
+
+    def get_text(self, key: str) -> Optional[str]:
+        data = self.get_bytes(key)
+        return data.decode("utf-8") if data is not None else None
+
+    # Prompts edited after the bundle was built are served live instead.
+    def lesson(self, prompt_id) -> Optional[str]:
+        if edited_since(prompt_id, self.built_at):
+            return None
+        return self.get_text(lesson_key(prompt_id))
+
+    def audio(self, prompt_id) -> Optional[bytes]:
+        if edited_since(prompt_id, self.built_at):
+            return None
+        return self.get_bytes(audio_key(prompt_id))
+
+    def audio_mime(self, prompt_id) -> str:
+        return self.metadata.get("audio_formats", {}).get(audio_key(prompt_id), "audio/wav")
+
+    def translation(self, text: str) -> Optional[str]:
+        return self.get_text(ui_key(text))
+
+    def close(self):
+        self._mmap.close()
+
+
+def write_bundle(path: str, entries: Dict[str, bytes], metadata: Dict) -> None:
+    """Write entries to a bundle file atomically."""
+    index_entries = {}
+    offset = 0
+    for key, data in entries.items():
+        index_entries[key] = (offset, len(data))
+        offset += len(data)
+    index = json.dumps({"metadata": metadata, "entries": index_entries}).encode("utf-8")
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(index)))
+        f.write(index)
+        for data in entries.values():
+            f.write(data)
+    os.replace(tmp_path, path)
+
+
+@lru_cache(maxsize=None)
+def load_bundle(language: Optional[str]) -> Optional[CurriculumBundle]:
+    """Map the bundle for a language once per process, or None if there is none."""
+    if not language:
+        return None
+    path = bundle_path(language)
+    if not os.path.exists(path):
+        return None
+    try:
+        return CurriculumBundle(path)
+    except (OSError, ValueError) as e:
+        print(f"Error loading curriculum bundle {path}: {e}")
+        return None
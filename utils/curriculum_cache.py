@@ -0,0 +1,87 @@
+import threading
+import time
+from typing import Any, Dict, Hashable, List, Optional
+
+# Curriculum rows only change when an editor changes them, and every change
+# evicts the affected prompt, so entries can live for a long time.
+DEFAULT_TTL = 24 * 3600
+
+_MISSING = object()
+
+
+class CurriculumCache:
+    """
+    In-process cache whose entries belong to a prompt_id.
+
+    Every instance registers itself so a curriculum change can evict exactly
+    the affected prompt from all caches with evict_prompt.
+    """
+
+    def __init__(self, name: str, ttl: float = DEFAULT_TTL):
+        self.name = name
+        self.ttl = ttl
+        self._entries: Dict[int, Dict[Hashable, tuple]] = {}
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def get(self, prompt_id: int, key: Hashable = None, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(int(prompt_id), {}).get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[int(prompt_id)][key]
+                return default
+            return value
+
+    def set(self, prompt_id: int, value: Any, key: Hashable = None) -> None:
+        with self._lock:
+            self._entries.setdefault(int(prompt_id), {})[key] = (time.monotonic() + self.ttl, value)
+
+    def evict(self, prompt_id: int) -> None:
+        with self._lock:
+            self._entries.pop(int(prompt_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_registry: List[CurriculumCache] = []
+_registry_lock = threading.Lock()
+
+# Epoch seconds of the last edit per prompt_id, with None for a change to
+# every prompt (TRUNCATE). Loaded from the curriculum_edits log by the
+# listener, so prebuilt bundle content older than an edit is never served,
+# even by workers started after the edit.
+_edited_at: Dict[Optional[int], float] = {}
+_edited_at_lock = threading.Lock()
+
+
+def record_edits(edits: Dict[Optional[int], float]) -> None:
+    """Merge prompt edit times, keeping the latest per prompt."""
+    with _edited_at_lock:
+        for prompt_id, edited_at in edits.items():
+            key = int(prompt_id) if prompt_id is not None else None
+            if edited_at > _edited_at.get(key, 0):
+                _edited_at[key] = edited_at
+
+
+def edited_since(prompt_id: int, since: float) -> bool:
+    """Whether a prompt, or the whole curriculum, was edited after since (epoch seconds)."""
+    with _edited_at_lock:
+        return max(_edited_at.get(int(prompt_id), 0), _edited_at.get(None, 0)) > since
+
+
+def evict_prompt(prompt_id: Optional[int]) -> None:
+    """Evict one prompt from every curriculum cache, or everything if prompt_id is None."""
+    with _registry_lock:
+        caches = list(_registry)
+    if prompt_id is None:
+        for cache in caches:
+            cache.clear()
+        return
+    for cache in caches:
+        cache.evict(prompt_id)
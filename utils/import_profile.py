@@ -0,0 +1,91 @@
+"""Report how long importing each entry-point module takes in a fresh interpreter.
+
+Runs ``python -X importtime -c "import <module>"`` per module, so every
+measurement is a cold start, and lists the slowest imports it pulled in.
+
+Usage:
+    python -m utils.import_profile
+    python -m utils.import_profile components.ai.lesson_service --top 20
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules main.py needs to render the login page, then those loaded after login.
+LOGIN_MODULES = [
+    "streamlit",
+    "database.user_progress_db",
+    "components.auth.auth",
+    "components.session.session",
+    "utils.render_metrics",
+]
+LESSON_MODULES = [
+    "api.sarvam_api",
+    "components.ai.lesson_service",
+    "utils.audio",
+]
+
+
+def _run_importtime(code: str):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Running {code!r} failed:\n{result.stderr[-2000:]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, _, fields = line.partition(":")
+        _, cumulative, name = (field.strip() for field in fields.split("|"))
+        entries.append((int(cumulative) / 1e6, name))
+    return entries
+
+
+def profile_import(module: str):
+    """
+    Import a module in a subprocess with -X importtime.
+
+    Returns:
+        tuple: (total seconds, list of (cumulative seconds, module name)) for
+        every import the module triggered
+    """
+    # Drop what the interpreter imports at startup (site, encodings, ...)
+    startup = {name for _, name in _run_importtime("pass")}
+    entries = [(seconds, name) for seconds, name in _run_importtime(f"import {module}") if name not in startup]
+
+    total = next((seconds for seconds, name in entries if name.strip() == module), 0.0)
+    return total, entries
+
+
+def top_level_entries(entries, top: int):
+    """The slowest imports by cumulative time, counting only top-level packages."""
+    top_level = [(seconds, name.strip()) for seconds, name in entries if "." not in name.strip()]
+    return sorted(top_level, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", help="Modules to profile (default: login and lesson modules)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list per module")
+    args = parser.parse_args()
+
+    groups = {"custom": args.modules} if args.modules else {"login": LOGIN_MODULES, "lesson": LESSON_MODULES}
+    for group, modules in groups.items():
+        print(f"== {group} ==")
+        for module in modules:
+            total, entries = profile_import(module)
+            print(f"{module}: {total * 1000:.0f} ms")
+            for seconds, name in top_level_entries(entries, args.top):
+                print(f"    {seconds * 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
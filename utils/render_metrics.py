@@ -0,0 +1,42 @@
+import time
+from functools import wraps
+
+import streamlit as st
+
+
+def _stats():
+    if 'render_stats' not in st.session_state:
+        st.session_state.render_stats = {}
+    return st.session_state.render_stats
+
+
+def timed(name):
+    """Record run count and render time of a page section in session state."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                # Runs even when the section calls st.rerun()
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                stats = _stats().setdefault(name, {"runs": 0, "total_ms": 0.0, "last_ms": 0.0})
+                stats["runs"] += 1
+                stats["total_ms"] += elapsed_ms
+                stats["last_ms"] = elapsed_ms
+        return wrapper
+    return decorator
+
+
+def render_stats_table():
+    """Rows of per-section render stats suitable for st.dataframe."""
+    return [
+        {
+            "section": name,
+            "runs": stats["runs"],
+            "last_ms": round(stats["last_ms"], 1),
+            "mean_ms": round(stats["total_ms"] / stats["runs"], 1) if stats["runs"] else 0.0,
+        }
+        for name, stats in _stats().items()
+    ]
@@ -0,0 +1,89 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from typing import Optional
+
+from api.resilience import TIMEOUTS
+
+MAX_WORKERS = 4
+# Transcripts kept for recordings that were never submitted.
+MAX_PENDING = 256
+
+
+def recording_id(audio_bytes: bytes) -> str:
+    """Identify a recording by its content."""
+    return hashlib.sha1(audio_bytes).hexdigest()[:16]
+
+
+class SpeculativeTranscriber:
+    """
+    Starts speech-to-text as soon as a recording is saved.
+
+    Transcripts are keyed by recording ID, so a re-recorded response gets a
+    new job and the old one is discarded.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="stt")
+        self._jobs: "OrderedDict[str, Future]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._sarvam_api = None
+
+    def _transcribe(self, audio_bytes: bytes) -> str:
+        if self._sarvam_api is None:
+            from api.sarvam_api import SarvamAPI
+
+            self._sarvam_api = SarvamAPI()
+        # Each job gets its own temp file, so concurrent jobs never collide.
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio_bytes)
+            return self._sarvam_api.speech_to_text(path)
+        finally:
+            os.remove(path)
+
+    def submit(self, rec_id: str, audio_bytes: bytes) -> None:
+        with self._lock:
+            if rec_id in self._jobs:
+                return
+            self._jobs[rec_id] = self._executor.submit(self._transcribe, audio_bytes)
+            while len(self._jobs) > MAX_PENDING:
+                _, stale = self._jobs.popitem(last=False)
+                stale.cancel()
+
+    def discard(self, rec_id: Optional[str]) -> None:
+        """Drop a recording's job, cancelling it if it has not started yet."""
+        with self._lock:
+            job = self._jobs.pop(rec_id, None)
+        if job is not None:
+            job.cancel()
+
+    def result(self, rec_id: Optional[str], timeout: float = TIMEOUTS["stt"]) -> Optional[str]:
+        """
+        Wait for the transcript of a recording.
+
+        The finished job is kept, so a retry after a failed grading step
+        reuses the transcript; call discard once it has been graded.
+
+        Returns:
+            The transcript, or None if no job exists for the recording
+
+        Raises:
+            TimeoutError: The job did not finish within timeout; it is cancelled
+        """
+        with self._lock:
+            job = self._jobs.get(rec_id)
+        if job is None:
+            return None
+        try:
+            return job.result(timeout=timeout)
+        except TimeoutError:
+            self.discard(rec_id)
+            raise
+
+
+transcriber = SpeculativeTranscriber()
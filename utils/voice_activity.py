@@ -0,0 +1,130 @@
+import io
+import threading
+import wave
+from collections import Counter
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+FRAME_MS = 30
+MIN_DURATION_S = 0.5
+MIN_VOICED_S = 0.3
+MIN_VOICED_RATIO = 0.1
+MIN_RMS_DBFS = -50.0
+# Frames count as voiced when louder than the noise floor by this many dB
+VOICE_MARGIN_DB = 10.0
+CLIP_LEVEL = 0.99
+MAX_CLIPPED_RATIO = 0.02
+SILENCE_DBFS = -200.0
+
+REJECTION_REASONS = {
+    "unreadable": "Recording could not be read. Please record your answer again.",
+    "too_short": "Recording is too short. Please speak your full answer.",
+    "silent": "Recording is silent. Please check your microphone and speak louder.",
+    "clipped": "Recording is distorted. Please move a little away from the microphone.",
+    "no_speech": "No speech was detected. Please record your answer again.",
+}
+
+
+class SpeechAnalysis(NamedTuple):
+    duration_s: float
+    rms_dbfs: float
+    voiced_ratio: float
+    clipped_ratio: float
+    rejection: Optional[str]
+
+    @property
+    def usable(self) -> bool:
+        return self.rejection is None
+
+    @property
+    def reason(self) -> Optional[str]:
+        """Message to show the learner when the recording is rejected."""
+        return REJECTION_REASONS.get(self.rejection)
+
+
+# Accepted/rejected recordings by reason, for the current process.
+gate_stats: Counter = Counter()
+_stats_lock = threading.Lock()
+
+
+def _to_dbfs(value):
+    return 20 * np.log10(np.maximum(value, 1e-10))
+
+
+def _read_samples(wav_bytes: bytes):
+    """Decode PCM WAV into mono float samples in [-1, 1] and the sample rate."""
+    with wave.open(io.BytesIO(wav_bytes), "rb") as reader:
+        channels = reader.getnchannels()
+        width = reader.getsampwidth()
+        rate = reader.getframerate()
+        frames = reader.readframes(reader.getnframes())
+
+    if width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768
+    elif width == 4:
+        samples = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648
+    else:
+        raise ValueError(f"Unsupported sample width: {width} bytes")
+
+    if channels > 1:
+        samples = samples[: len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+    return samples, rate
+
+
+def analyze_speech(wav_bytes: bytes) -> SpeechAnalysis:
+    """
+    Measure whether a recording contains usable speech.
+
+    Checks duration, overall RMS level, the share of frames that rise above
+    the noise floor, and the share of clipped samples.
+
+    Args:
+        wav_bytes: Recorded PCM WAV audio
+
+    Returns:
+        SpeechAnalysis whose rejection is None if the recording is usable
+    """
+    try:
+        samples, rate = _read_samples(wav_bytes)
+    except (wave.Error, EOFError, ValueError) as e:
+        print(f"Error reading recording: {e}")
+        return _record(SpeechAnalysis(0.0, SILENCE_DBFS, 0.0, 0.0, "unreadable"))
+
+    frame_length = max(1, int(rate * FRAME_MS / 1000))
+    if len(samples) < frame_length:
+        return _record(SpeechAnalysis(round(len(samples) / rate, 2), SILENCE_DBFS, 0.0, 0.0, "too_short"))
+    duration_s = len(samples) / rate
+
+    rms_dbfs = float(_to_dbfs(np.sqrt(np.mean(samples ** 2))))
+    clipped_ratio = float(np.mean(np.abs(samples) >= CLIP_LEVEL))
+
+    frame_count = len(samples) // frame_length
+    frames = samples[: frame_count * frame_length].reshape(frame_count, frame_length)
+    frame_dbfs = _to_dbfs(np.sqrt(np.mean(frames ** 2, axis=1)))
+    noise_floor = np.percentile(frame_dbfs, 10)
+    voiced = frame_dbfs > max(noise_floor + VOICE_MARGIN_DB, MIN_RMS_DBFS)
+    voiced_ratio = float(np.mean(voiced))
+    voiced_s = voiced_ratio * duration_s
+
+    if duration_s < MIN_DURATION_S:
+        rejection = "too_short"
+    elif rms_dbfs < MIN_RMS_DBFS:
+        rejection = "silent"
+    elif clipped_ratio > MAX_CLIPPED_RATIO:
+        rejection = "clipped"
+    elif voiced_ratio < MIN_VOICED_RATIO or voiced_s < MIN_VOICED_S:
+        rejection = "no_speech"
+    else:
+        rejection = None
+
+    return _record(SpeechAnalysis(round(duration_s, 2), round(rms_dbfs, 1), round(voiced_ratio, 3),
+                                  round(clipped_ratio, 4), rejection))
+
+
+def _record(analysis: SpeechAnalysis) -> SpeechAnalysis:
+    with _stats_lock:
+        gate_stats[analysis.rejection or "accepted"] += 1
+    return analysis